@@ -0,0 +1,464 @@
+"""Offline benchmark for get_news.py.
+
+Serves recorded or synthetic RSS/Atom fixtures from local stand-in servers
+(one port per upstream role, each given the per-host limit of the live hosts
+it replaces, so the fetch pool is throttled as it is live),
+runs the real pipeline against them and times each stage.
+
+    python scripts/bench_news.py --scale 10 --latency-ms 150 --p429 0.05
+    python scripts/bench_news.py --record scripts/bench/fixtures   # snapshot live feeds once
+    python scripts/bench_news.py --fixtures scripts/bench/fixtures --compare old.json
+"""
+import argparse
+import base64
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from urllib.request import urlopen
+from xml.sax.saxutils import escape, quoteattr
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BASE_DIR)
+
+STAGES = [
+    "build_harm_items",
+    "build_forum_items",
+    "build_release_items",
+    "cluster_to_signals",
+    "build_coverage",
+    "build_summaries",
+    "write_outputs",
+]
+
+# Entries per feed at --scale 1, roughly what each upstream returns today.
+BASE_ENTRIES = {"google": 100, "reddit": 25, "hn": 20, "releases": 20}
+
+ROLE_HOSTS = {
+    "news.google.com": "google",
+    "reddit.com": "reddit",
+    "hnrss.org": "hn",
+}
+
+FALLBACK_TITLES = [
+    "AI voice cloning scam targets UK pensioners",
+    "Police warn of deepfake sextortion wave",
+    "Researchers show prompt injection against coding agents",
+    "Extremist groups experiment with chatbot propaganda",
+    "Dark web market sells AI-written malware kits",
+]
+FILLER = ["new", "report", "warns", "UK", "police", "study", "experts", "latest", "online", "criminals"]
+
+
+def role_for_url(url):
+    host = (urlparse(url).netloc or "").lower()
+    for known, role in ROLE_HOSTS.items():
+        if host == known or host.endswith("." + known):
+            return role
+    return "releases"
+
+
+def fixture_key(path_and_query):
+    return hashlib.sha1(path_and_query.encode("utf-8")).hexdigest()
+
+
+def seed_titles():
+    try:
+        with open(os.path.join(REPO_DIR, "public", "news_data.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return FALLBACK_TITLES
+    titles = [
+        x["title"]
+        for section in (data.get("sections") or {}).values()
+        for x in section
+        if isinstance(x, dict) and x.get("title")
+    ]
+    return sorted(set(titles)) or FALLBACK_TITLES
+
+
+def vary_title(rng, title):
+    words = title.split()
+    if rng.random() < 0.4 and len(words) > 3:
+        words.insert(rng.randrange(len(words)), rng.choice(FILLER))
+    if rng.random() < 0.3:
+        words.append(rng.choice(FILLER))
+    return " ".join(words)
+
+
+def synthetic_feed(role, path, scale, titles, port_for):
+    rng = random.Random(fixture_key(role + path))
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    n = max(1, int(BASE_ENTRIES[role] * scale))
+    max_age_h = 24 * 7 if role == "google" else 48 if role in ("reddit", "hn") else 24 * 300
+    entries = []
+    for i in range(n):
+        title = vary_title(rng, rng.choice(titles))
+        dt = now - timedelta(seconds=int(rng.random() * max_age_h * 3600))
+        entries.append((i, title, dt))
+
+    if role == "reddit":
+        body = []
+        for i, title, dt in entries:
+            link = f"https://www.reddit.com/r/bench/comments/{i:x}{rng.randrange(1 << 20):x}/"
+            body.append(
+                f"<entry><author><name>/u/bench{i % 50}</name></author><id>t3_{i}</id>"
+                f"<link href={quoteattr(link)} /><updated>{dt.isoformat()}</updated>"
+                f"<published>{dt.isoformat()}</published><title>{escape(title)}</title>"
+                f"<content type=\"html\">{escape('<p>' + title + '</p>')}</content></entry>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>bench</title><updated>{now.isoformat()}</updated>{''.join(body)}</feed>"
+        ).encode("utf-8")
+
+    items = []
+    for i, title, dt in entries:
+        if role == "google":
+            publisher = f"Publisher {rng.randrange(40)}"
+            token = base64.urlsafe_b64encode(f"{path}#{i}".encode("utf-8")).decode("ascii").rstrip("=")
+            link = f"http://127.0.0.1:{port_for('google')}/rss/articles/{token}?oc=5"
+            items.append(
+                f"<item><title>{escape(title + ' - ' + publisher)}</title><link>{escape(link)}</link>"
+                f"<guid isPermaLink=\"false\">{token}</guid><pubDate>{format_datetime(dt)}</pubDate>"
+                f"<description>{escape(title)}</description>"
+                f"<source url=\"https://publisher{rng.randrange(40)}.example\">{escape(publisher)}</source></item>"
+            )
+        else:
+            link = f"https://example.com/{role}/{i}"
+            items.append(
+                f"<item><title>{escape(title)}</title><link>{escape(link)}</link>"
+                f"<pubDate>{format_datetime(dt)}</pubDate><description>{escape(title)}</description></item>"
+            )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>bench</title>'
+        f"{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    # The pipeline drops idle keep-alive connections when it is done with them; that is not a stand-in failure.
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class StandIn:
+    def __init__(self, args, titles):
+        self.args = args
+        self.titles = titles
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.cache = {}
+        self.cache_lock = threading.Lock()
+        self.servers = {}
+        self.requests = 0
+
+    def port_for(self, role):
+        return self.servers[role].server_address[1]
+
+    def roll(self):
+        with self.rng_lock:
+            self.requests += 1
+            return self.rng.random(), self.rng.random()
+
+    def body_for(self, role, path):
+        key = (role, path)
+        with self.cache_lock:
+            if key in self.cache:
+                return self.cache[key]
+        body = None
+        if self.args.fixtures:
+            recorded = os.path.join(self.args.fixtures, role, fixture_key(path) + ".xml")
+            if os.path.exists(recorded):
+                with open(recorded, "rb") as f:
+                    body = f.read()
+        if body is None:
+            body = synthetic_feed(role, path, self.args.scale, self.titles, self.port_for)
+        with self.cache_lock:
+            self.cache[key] = body
+        return body
+
+    def handler(self, role):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                a = standin.args
+                jitter, outcome = standin.roll()
+                time.sleep(max(0.0, a.latency_ms * (1 + a.jitter * (2 * jitter - 1))) / 1000.0)
+                if self.path == "/__stats":
+                    return self.reply(200, json.dumps({"requests": standin.requests}).encode("utf-8"))
+                if self.path.startswith("/rss/articles/"):
+                    target = f"http://127.0.0.1:{standin.port_for('releases')}/publisher{self.path[len('/rss/articles'):]}"
+                    return self.reply(302, headers={"Location": target})
+                if self.path.startswith("/publisher/"):
+                    return self.reply(200, b"<html><body>article</body></html>", {"Content-Type": "text/html"})
+                if outcome < a.p429:
+                    return self.reply(429, headers={"Retry-After": "1"})
+                if outcome < a.p429 + a.pfail:
+                    return self.reply(503)
+                body = standin.body_for(role, self.path)
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                if self.headers.get("If-None-Match") == etag:
+                    return self.reply(304, headers={"ETag": etag})
+                self.reply(200, body, {"Content-Type": "application/xml", "ETag": etag})
+
+        return Handler
+
+    def start(self):
+        for role in BASE_ENTRIES:
+            server = QuietHTTPServer(("127.0.0.1", 0), self.handler(role))
+            server.daemon_threads = True
+            self.servers[role] = server
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+
+def serve_standin(args, titles, conn):
+    standin = StandIn(args, titles)
+    standin.start()
+    conn.send({role: standin.port_for(role) for role in standin.servers})
+    conn.recv()
+    standin.stop()
+
+
+class StandInProcess:
+    # The stand-in runs in its own process so serving fixtures doesn't compete
+    # with the pipeline for the GIL and skew the timings.
+    def __init__(self, args, titles):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve_standin, args=(args, titles, child_conn), daemon=True)
+
+    def start(self):
+        self.process.start()
+        self.ports = self.conn.recv()
+
+    def stop(self):
+        self.conn.send("stop")
+        self.process.join(timeout=10)
+
+    def requests_served(self):
+        with urlopen(f"http://127.0.0.1:{self.ports['releases']}/__stats", timeout=10) as r:
+            return json.load(r)["requests"]
+
+    def local_url(self, url):
+        p = urlparse(url)
+        path = p.path + (f"?{p.query}" if p.query else "")
+        return f"http://127.0.0.1:{self.ports[role_for_url(url)]}{path}"
+
+    def match_host_limits(self, gn, urls):
+        # 127.0.0.1:<port> never matches HOST_CONCURRENCY, so each port would get the default limit.
+        # Give it the combined limit of the live hosts it stands in for instead.
+        hosts = {}
+        for url in urls:
+            hosts.setdefault(role_for_url(url), set()).add(gn.host_key(url))
+        for role, live in hosts.items():
+            limit = sum(gn.HOST_CONCURRENCY.get(h, gn.DEFAULT_HOST_CONCURRENCY) for h in live)
+            gn.HOST_CONCURRENCY[f"127.0.0.1:{self.ports[role]}"] = limit
+
+
+class StageTimer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def wrap(self, name, fn):
+        timer = self
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with timer.lock:
+                    timer.samples.setdefault(name, []).append(elapsed)
+
+        return timed
+
+
+def load_pipeline(env):
+    os.environ.update(env)
+    sys.path.insert(0, BASE_DIR)
+    import get_news
+    return get_news
+
+
+def record_fixtures(gn, out_dir):
+    harm_queries = gn.load_json_if_exists(os.path.join(gn.BASE_DIR, "harm_queries.json"), gn.DEFAULT_HARM_QUERIES)
+    forum_feeds = gn.load_json_if_exists(os.path.join(gn.BASE_DIR, "forum_feeds.json"), gn.DEFAULT_FORUM_FEEDS)
+    urls = [url for _, _, url in gn.harm_feed_jobs(harm_queries)]
+    urls += [cfg["url"] for cfg in forum_feeds if cfg.get("url")]
+    urls += [url for _, url in gn.RELEASE_SOURCES]
+    futures = [gn.submit_fetch(url) for url in urls]
+    for url, future in zip(urls, futures):
+        body = future.result()
+        p = urlparse(url)
+        path = p.path + (f"?{p.query}" if p.query else "")
+        role = role_for_url(url)
+        os.makedirs(os.path.join(out_dir, role), exist_ok=True)
+        if body:
+            with open(os.path.join(out_dir, role, fixture_key(path) + ".xml"), "wb") as f:
+                f.write(body)
+        print(f"{'ok ' if body else 'ERR'} {len(body):>9} {url}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def summarise(samples):
+    return {
+        "runs": len(samples),
+        "median_s": round(statistics.median(samples), 4),
+        "min_s": round(min(samples), 4),
+        "max_s": round(max(samples), 4),
+    }
+
+
+def compare(results, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\n{'stage':<22}{'before':>10}{'after':>10}{'change':>10}")
+    for name in ["total"] + STAGES:
+        before = (previous["stages"].get(name) or {}).get("median_s")
+        after = (results["stages"].get(name) or {}).get("median_s")
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<22}{before:>10.3f}{after:>10.3f}{change:>+9.1f}%")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", type=float, default=1.0, help="entries per feed relative to today's volume (e.g. 10, 100)")
+    ap.add_argument("--latency-ms", type=float, default=100.0, help="mean response latency of the stand-in hosts")
+    ap.add_argument("--jitter", type=float, default=0.3, help="latency jitter as a fraction of --latency-ms")
+    ap.add_argument("--p429", type=float, default=0.0, help="probability a feed request gets a 429")
+    ap.add_argument("--pfail", type=float, default=0.0, help="probability a feed request gets a 503")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--warm", action="store_true", help="keep STATE_DIR (HTTP cache, item store) between repeats")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--fixtures", help="directory of recorded fixtures (<role>/<sha1(path)>.xml); missing ones are synthesised")
+    ap.add_argument("--record", metavar="DIR", help="fetch the live feeds once into DIR and exit")
+    ap.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra get_news.py settings")
+    ap.add_argument("--trace-memory", action="store_true", help="report tracemalloc peak per run (slows the run)")
+    ap.add_argument("--out", help="results file (default scripts/bench/results-<timestamp>.json)")
+    ap.add_argument("--compare", metavar="RESULTS", help="print stage deltas against an earlier results file")
+    args = ap.parse_args()
+
+    if args.record:
+        record_fixtures(load_pipeline({}), args.record)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="aihm-bench-")
+    state_dir = os.path.join(work_dir, "state")
+    env = {"STATE_DIR": state_dir, "OUTPUT_DIR": os.path.join(work_dir, "out")}
+    env.update(dict(kv.split("=", 1) for kv in args.env))
+    gn = load_pipeline(env)
+
+    standin = StandInProcess(args, seed_titles())
+    standin.start()
+    timer = StageTimer()
+    for name in STAGES:
+        setattr(gn, name, timer.wrap(name, getattr(gn, name)))
+    harm_queries = gn.load_json_if_exists(os.path.join(gn.BASE_DIR, "harm_queries.json"), gn.DEFAULT_HARM_QUERIES)
+    forum_feeds = gn.load_json_if_exists(os.path.join(gn.BASE_DIR, "forum_feeds.json"), gn.DEFAULT_FORUM_FEEDS)
+    live_urls = [gn.GOOGLE_NEWS_RSS_SEARCH] + [url for _, url in gn.RELEASE_SOURCES]
+    live_urls += [cfg["url"] for cfg in forum_feeds if cfg.get("url")]
+    standin.match_host_limits(gn, live_urls)
+    gn.GOOGLE_NEWS_RSS_SEARCH = standin.local_url(gn.GOOGLE_NEWS_RSS_SEARCH)
+    gn.RELEASE_SOURCES = [(name, standin.local_url(url)) for name, url in gn.RELEASE_SOURCES]
+    forum_feeds = [dict(cfg, url=standin.local_url(cfg["url"])) if cfg.get("url") else cfg for cfg in forum_feeds]
+
+    totals, peaks, counts, served = [], [], {}, 0
+    try:
+        for i in range(args.repeat):
+            if not args.warm:
+                shutil.rmtree(state_dir, ignore_errors=True)
+            if args.trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            gn.run(harm_queries=harm_queries, forum_feeds=forum_feeds)
+            totals.append(time.perf_counter() - start)
+            if args.trace_memory:
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            print(f"run {i + 1}/{args.repeat}: {totals[-1]:.2f}s")
+        out_file = os.path.join(env["OUTPUT_DIR"], "news_data.json")
+        if os.path.exists(out_file):
+            with open(out_file, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            counts = {k: len(v) for k, v in payload.get("sections", {}).items()}
+        served = standin.requests_served()
+    finally:
+        standin.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "record")},
+        "env": {k: v for k, v in env.items() if k not in ("STATE_DIR", "OUTPUT_DIR")},
+        "requests_served": served,
+        "stages": {"total": summarise(totals), **{name: summarise(timer.samples[name]) for name in STAGES if name in timer.samples}},
+        "items": counts,
+    }
+    if peaks:
+        results["peak_memory_mb"] = round(max(peaks) / (1024 * 1024), 1)
+
+    out_path = args.out or os.path.join(BASE_DIR, "bench", f"results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'stage':<22}{'median':>10}{'min':>10}{'max':>10}")
+    for name, st in results["stages"].items():
+        print(f"{name:<22}{st['median_s']:>10.3f}{st['min_s']:>10.3f}{st['max_s']:>10.3f}")
+    print(f"items: {counts}")
+    print(f"Wrote {out_path}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,80 @@
-import json "Reddit: Scams (new)", "url": "https://old.reddit.com/r/Scams/new/.rss", "tags": ["forum", "reddit", "fraud"]},
+import argparse
+import base64
+import csv
+import gzip
+import hashlib
+import heapq
+import html
+import io
+import json
+import math
+import operator
+import os
+import random
+import re
+import sqlite3
+import sys
+import tarfile
+import threading
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict, deque
+from itertools import chain
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from urllib.parse import quote_plus, urljoin, urlparse, parse_qsl, urlencode, urlunparse
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BASE_DIR = os.path.dirname(__file__)
+
+# ---------- DEFAULTS ----------
+DEFAULT_HARM_QUERIES = {
+    "RA09 – AI use in financial crime, fraud and exploitation": (
+        "AI scam OR AI fraud OR AI phishing OR voice cloning scam OR AI impersonation "
+        "OR AI money laundering OR mule recruitment"
+    ),
+    "RA11 – AI Use for Sexual Crime and Abuse": (
+        "deepfake abuse OR image-based abuse OR NCII OR non-consensual intimate imagery OR AI harassment "
+        "OR AI stalking OR AI sextortion OR AI grooming OR AI-generated child abuse material OR CSAM AI"
+    ),
+    "RA13 – AI use in terrorism": (
+        "AI extremism OR AI radicalisation OR synthetic propaganda OR extremist chatbot "
+        "OR terrorist recruitment AI OR terrorist attack planning AI"
+    ),
+    "RA14 – AI increases illegal item creation and acquisition": (
+        "AI weapons OR AI drugs OR AI crime instructions OR AI malware OR LLM exploit OR prompt injection "
+        "OR jailbreak OR ransomware AI OR dark web AI OR counterfeit goods AI"
+    ),
+    "Cross-cutting / unassigned": (
+        "AI violence OR AI-enabled crime OR false evidence AI OR liar's dividend OR fake identity documents AI "
+        "OR border exploitation AI OR immigration abuse chatbot"
+    ),
+}
+
+DEFAULT_FORUM_FEEDS = [
+    {"name": "Reddit: Scams (new)", "url": "https://old.reddit.com/r/Scams/new/.rss", "tags": ["forum", "reddit", "fraud"]},
     {"name": "Reddit: netsec (new)", "url": "https://old.reddit.com/r/netsec/new/.rss", "tags": ["forum", "reddit", "cyber"]},
     {"name": "Reddit: cybersecurity (new)", "url": "https://old.reddit.com/r/cybersecurity/new/.rss", "tags": ["forum", "reddit", "cyber"]},
     {"name": "Reddit: Malware (new)", "url": "https://old.reddit.com/r/Malware/new/.rss", "tags": ["forum", "reddit", "cyber"]},
@@ -11,16 +87,94 @@ import json "Reddit: Scams (new)", "url": "https://old.reddit.com/r/Scams/new/.r
 LOCALE_HL = os.getenv("NEWS_HL", "en-GB")
 LOCALE_GL = os.getenv("NEWS_GL", "GB")
 LOCALE_CEID = os.getenv("NEWS_CEID", "GB:en")
+NEWS_LOCALES = os.getenv("NEWS_LOCALES", "")  # e.g. "en-GB:GB,en-US:US"; empty uses NEWS_HL/NEWS_GL/NEWS_CEID
+HARM_TERMS_PER_SHARD = int(os.getenv("HARM_TERMS_PER_SHARD", "4"))  # 0 keeps each category as one query
 TIME_WINDOW = os.getenv("TIME_WINDOW", "7d")
 RELEASE_TIME_WINDOW = os.getenv("RELEASE_TIME_WINDOW", "365d")
 MAX_PER_HARM = int(os.getenv("MAX_PER_HARM", "25"))
 MAX_RELEASES = int(os.getenv("MAX_RELEASES", "50"))
 MAX_FORUM_ITEMS = int(os.getenv("MAX_FORUM_ITEMS", "30"))
 SIGNAL_SIM_THRESHOLD = float(os.getenv("SIGNAL_SIM_THRESHOLD", "0.86"))
+SIGNAL_MINHASH_PERMS = int(os.getenv("SIGNAL_MINHASH_PERMS", "64"))
+SIGNAL_SHINGLE_CHARS = int(os.getenv("SIGNAL_SHINGLE_CHARS", "4"))
+FORUM_MIN_SIMILARITY = float(os.getenv("FORUM_MIN_SIMILARITY", "0.08"))  # TF-IDF cosine a forum title needs to join a category
+FORUM_MIN_TERMS = int(os.getenv("FORUM_MIN_TERMS", "2"))  # distinct category query terms the title must also share
+THEME_TERMS = int(os.getenv("THEME_TERMS", "6"))
 DEDUP_MODE = os.getenv("DEDUP_MODE", "title_fingerprint_v5_ho_owned")
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "12"))
+DEFAULT_HOST_CONCURRENCY = int(os.getenv("DEFAULT_HOST_CONCURRENCY", "2"))
+HOST_CONCURRENCY = {
+    "news.google.com": int(os.getenv("GOOGLE_NEWS_CONCURRENCY", "4")),
+    "reddit.com": int(os.getenv("REDDIT_CONCURRENCY", "2")),
+    "hnrss.org": int(os.getenv("HNRSS_CONCURRENCY", "3")),
+}
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(BASE_DIR, ".cache"))
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(STATE_DIR, "http"))
+HTTP_CACHE_MAX_AGE_DAYS = float(os.getenv("HTTP_CACHE_MAX_AGE_DAYS", "14"))
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(STATE_DIR, "archive"))  # "" disables the raw archive
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+REPROCESS_WORKERS = int(os.getenv("REPROCESS_WORKERS", str(os.cpu_count() or 2)))
+FEED_HEALTH_FILE = os.getenv("FEED_HEALTH_FILE", os.path.join(STATE_DIR, "feed_health.json"))
+FEED_HEALTH_WINDOW = int(os.getenv("FEED_HEALTH_WINDOW", "20"))  # recent fetches kept for success rate and latency
+FEED_HEALTH_MAX_AGE_DAYS = float(os.getenv("FEED_HEALTH_MAX_AGE_DAYS", "30"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))  # consecutive failed fetches before a feed is skipped
+BREAKER_BASE_SECONDS = float(os.getenv("BREAKER_BASE_SECONDS", "3600"))
+BREAKER_MAX_SECONDS = float(os.getenv("BREAKER_MAX_SECONDS", "86400"))
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", BASE_DIR)
+OUTPUT_MODE = os.getenv("OUTPUT_MODE", "single")  # single | sharded | both
+SHARD_DIR = os.getenv("SHARD_DIR", os.path.join(OUTPUT_DIR, "news_data"))
+SHARD_PAGE_SIZE = int(os.getenv("SHARD_PAGE_SIZE", "50"))
+SEARCH_INDEX = os.getenv("SEARCH_INDEX", "1") == "1"  # news_index.json next to the output
+DELTA_DIR = os.getenv("DELTA_DIR", os.path.join(OUTPUT_DIR, "changes"))  # "" disables the change feed
+DELTA_STATE_FILE = os.getenv("DELTA_STATE_FILE", os.path.join(STATE_DIR, "change_feed_state.json"))
+DELTA_RING = int(os.getenv("DELTA_RING", "48"))  # deltas kept for clients catching up
+DELTA_SNAPSHOT_EVERY = int(os.getenv("DELTA_SNAPSHOT_EVERY", "24"))  # versions between full snapshots
+METRICS_FILE = os.getenv("METRICS_FILE", "")  # *.prom for a Prometheus textfile, anything else appends JSON lines
+FEED_PARSER = os.getenv("FEED_PARSER", "fast")  # fast (streaming, feedparser fallback) | feedparser
+STATS_TRACE_MEMORY = os.getenv("STATS_TRACE_MEMORY", "0") == "1"
+ITEM_STORE_PATH = os.getenv("ITEM_STORE_PATH", os.path.join(STATE_DIR, "items.sqlite3"))
+ITEM_STORE_RETENTION_DAYS = float(os.getenv("ITEM_STORE_RETENTION_DAYS", "180"))
+ITEM_STORE_BATCH = int(os.getenv("ITEM_STORE_BATCH", "500"))
+FORUM_BATCH = int(os.getenv("FORUM_BATCH", "2000"))
+TREND_WINDOW_HOURS = int(os.getenv("TREND_WINDOW_HOURS", "24"))
+TREND_BASELINE_DAYS = int(os.getenv("TREND_BASELINE_DAYS", "28"))
+TREND_HOURLY_RETENTION_DAYS = float(os.getenv("TREND_HOURLY_RETENTION_DAYS", "14"))
+TREND_DAILY_RETENTION_DAYS = float(os.getenv("TREND_DAILY_RETENTION_DAYS", "400"))
+TREND_TOP_SOURCES = int(os.getenv("TREND_TOP_SOURCES", "10"))
+RESOLVE_GOOGLE_LINKS = os.getenv("RESOLVE_GOOGLE_LINKS", "1") == "1"
+RESOLVE_MAX_PER_RUN = int(os.getenv("RESOLVE_MAX_PER_RUN", "150"))  # network lookups; the rest wait for a later run
+RESOLVE_PER_CATEGORY = int(os.getenv("RESOLVE_PER_CATEGORY", str(2 * MAX_PER_HARM)))  # network lookups only for each category's top candidates
+LINK_CACHE_FILE = os.getenv("LINK_CACHE_FILE", os.path.join(STATE_DIR, "links.json"))
+LINK_CACHE_TTL_DAYS = float(os.getenv("LINK_CACHE_TTL_DAYS", "30"))
+LINK_CACHE_MISS_TTL_DAYS = float(os.getenv("LINK_CACHE_MISS_TTL_DAYS", "1"))
+AIID_SNAPSHOT = os.getenv("AIID_SNAPSHOT", "")  # backup-*.tar.bz2 file, a directory of them, a URL, or "auto"; "" skips ingestion
+AIID_DB_PATH = os.getenv("AIID_DB_PATH", os.path.join(STATE_DIR, "aiid.sqlite3"))
+AIID_MATCH_THRESHOLD = float(os.getenv("AIID_MATCH_THRESHOLD", "0.5"))
+AIID_MATCH_MAX_AGE_DAYS = float(os.getenv("AIID_MATCH_MAX_AGE_DAYS", "0"))  # 0 links incidents of any date
+AIID_MAX_MATCHES = int(os.getenv("AIID_MAX_MATCHES", "3"))
+SCHEDULE_FILE = os.getenv("SCHEDULE_FILE", os.path.join(STATE_DIR, "schedule.json"))
+DAEMON_MIN_INTERVAL = float(os.getenv("DAEMON_MIN_INTERVAL", "120"))
+DAEMON_MAX_INTERVAL = float(os.getenv("DAEMON_MAX_INTERVAL", "21600"))
+DAEMON_START_INTERVAL = float(os.getenv("DAEMON_START_INTERVAL", "900"))
+DAEMON_TARGET_NEW = float(os.getenv("DAEMON_TARGET_NEW", "3"))  # new entries we aim to find per poll
+DAEMON_RATE_ALPHA = float(os.getenv("DAEMON_RATE_ALPHA", "0.3"))
+DAEMON_JITTER = float(os.getenv("DAEMON_JITTER", "0.15"))
+DAEMON_DEBOUNCE = float(os.getenv("DAEMON_DEBOUNCE", "60"))
+DAEMON_DEBOUNCE_MAX = float(os.getenv("DAEMON_DEBOUNCE_MAX", "600"))
+DEFAULT_HOST_POLLS_PER_HOUR = float(os.getenv("DEFAULT_HOST_POLLS_PER_HOUR", "30"))
+HOST_POLLS_PER_HOUR = {
+    "news.google.com": float(os.getenv("GOOGLE_NEWS_POLLS_PER_HOUR", "60")),
+    "reddit.com": float(os.getenv("REDDIT_POLLS_PER_HOUR", "60")),
+    "hnrss.org": float(os.getenv("HNRSS_POLLS_PER_HOUR", "60")),
+}
 
+GOOGLE_NEWS_RSS_SEARCH = "https://news.google.com/rss/search"
 OPENAI_NEWS_RSS = "https://openai.com/news/rss.xml"
 RUNDOWN_RSS = "https://rss.beehiiv.com/feeds/2R3C6Bt5wj.xml"
+RELEASE_SOURCES = [("OpenAI News", OPENAI_NEWS_RSS), ("The Rundown", RUNDOWN_RSS)]
+AIID_SNAPSHOTS_URL = "https://incidentdatabase.ai/research/snapshots/"
+AIID_SNAPSHOT_RE = re.compile(r"backup-\d{14}\.tar\.bz2")
 
 HEADERS = {
     "User-Agent": "AIHM-Horizon-Scanning/1.0 (rss fetch)",
@@ -51,6 +205,26 @@ RELEASE_EXCLUDE = [
     "mou", "board", "appoint", "donating", "contract", "investment", "acquires", "acquisition"
 ]
 
+# First matching rule wins; order matters.
+SUBTYPE_RULES = [
+    ("Impersonation / phishing / scam scripts", ["fraud", "scam", "money laundering", "phishing", "impersonation", "voice clone"]),
+    ("CSAM / CSEA", ["csam", "child abuse", "child sexual", "grooming"]),
+    ("NCII / sexualised deepfake imagery", ["ncii", "synthetic image", "deepfake abuse", "image abuse", "intimate image", "revenge porn"]),
+    ("VAWG / stalking / harassment / coercion", ["stalking", "harassment", "coercion", "sextortion", "audio abuse"]),
+    ("Propaganda / radicalisation / recruitment", ["terrorist", "extremist", "radicalisation", "radicalization", "propaganda", "recruitment"]),
+    ("Attack planning / operational guidance", ["attack planning", "attack preparation", "crime instructions", "weapon", "explosive"]),
+    ("Illegal items / drugs / firearms", ["drugs", "firearms", "weapons", "illicit items", "dark web", "counterfeit"]),
+    ("Cyber-enabled criminal methods / attack enablement", ["ransomware", "malware", "jailbreak", "prompt injection", "exploit"]),
+    ("Evidential risk / false documents / border exploitation", ["false evidence", "identity documents", "court", "bank statements", "birth certificates", "border", "immigration"]),
+]
+CATEGORY_SUBTYPE_FALLBACKS = {
+    "RA09 – AI use in financial crime, fraud and exploitation": "General fraud / financial crime",
+    "RA11 – AI Use for Sexual Crime and Abuse": "General sexual crime / abuse",
+    "RA13 – AI use in terrorism": "General terrorism / extremism use case",
+    "RA14 – AI increases illegal item creation and acquisition": "General illegal item / crime-enablement use case",
+    "Cross-cutting / unassigned": "Legacy / cross-cutting",
+}
+
 # ---------- HELPERS ----------
 def load_json_if_exists(path, fallback):
     if os.path.exists(path):
@@ -81,36 +255,935 @@ def parse_date(date_str):
         return datetime.now(timezone.utc)
 
 
-def google_rss_url(q, window):
+def google_rss_url(q, window, locale=None):
+    hl, gl, ceid = locale or (LOCALE_HL, LOCALE_GL, LOCALE_CEID)
     q2 = f"{q} when:{window}"
     return (
-        "https://news.google.com/rss/search?q="
+        GOOGLE_NEWS_RSS_SEARCH
+        + "?q="
         + quote_plus(q2)
-        + f"&hl={quote_plus(LOCALE_HL)}&gl={quote_plus(LOCALE_GL)}&ceid={quote_plus(LOCALE_CEID)}"
+        + f"&hl={quote_plus(hl)}&gl={quote_plus(gl)}&ceid={quote_plus(ceid)}"
     )
 
 
-def fetch_url(url, retries=3, base_sleep=1.0):
-    for i in range(retries):
+def news_locales():
+    locales = []
+    for part in NEWS_LOCALES.split(","):
+        hl, _, gl = part.strip().partition(":")
+        if hl and gl:
+            locales.append((hl, gl, f"{gl}:{hl.split('-')[0]}"))
+    return locales or [(LOCALE_HL, LOCALE_GL, LOCALE_CEID)]
+
+
+def harm_query_text(spec):
+    # harm_queries.json values are either the query string or {"query": ..., "terms_per_shard": n}.
+    return spec.get("query", "") if isinstance(spec, dict) else (spec or "")
+
+
+def split_or_terms(query):
+    terms, buf = [], []
+    for part in re.split(r"\s+OR\s+", query or ""):
+        buf.append(part)
+        joined = " OR ".join(buf)
+        # Only split at the top level, not inside quotes or parentheses.
+        if joined.count('"') % 2 == 0 and joined.count("(") == joined.count(")"):
+            terms.append(joined.strip())
+            buf = []
+    if buf:
+        terms.append(" OR ".join(buf).strip())
+    return [t for t in terms if t]
+
+
+def shard_query(query, terms_per_shard):
+    terms = split_or_terms(query)
+    if terms_per_shard <= 0 or len(terms) <= terms_per_shard:
+        return [query]
+    return [" OR ".join(terms[i:i + terms_per_shard]) for i in range(0, len(terms), terms_per_shard)]
+
+
+def harm_feed_jobs(harm_queries, categories=None):
+    if _REPLAY is not None:
+        # Replays keep the queries the run was fetched with; only classification uses the current ones.
+        return [job for job in replay_jobs("google:") if categories is None or job[0] in categories]
+    jobs = []
+    locales = news_locales()
+    for category, spec in harm_queries.items():
+        if categories is not None and category not in categories:
+            continue
+        per_shard = spec.get("terms_per_shard", HARM_TERMS_PER_SHARD) if isinstance(spec, dict) else HARM_TERMS_PER_SHARD
+        shards = shard_query(harm_query_text(spec), int(per_shard))
+        for locale in locales:
+            for i, shard in enumerate(shards):
+                label = f"google:{category}"
+                if len(shards) > 1 or len(locales) > 1:
+                    label += f" [{locale[0]} {i + 1}/{len(shards)}]"
+                jobs.append((category, label, google_rss_url(shard, TIME_WINDOW, locale)))
+    return jobs
+
+
+def window_seconds(window):
+    m = re.fullmatch(r"\s*(\d+)\s*([hdwmy])\s*", (window or "").lower())
+    if not m:
+        return 7 * 86400
+    unit = {"h": 3600, "d": 86400, "w": 7 * 86400, "m": 30 * 86400, "y": 365 * 86400}[m.group(2)]
+    return int(m.group(1)) * unit
+
+
+# ---------- RUN STATS ----------
+_RUN_STATS = {"feeds": {}, "stages": {}}
+_RUN_STATS_LOCK = threading.Lock()
+
+
+def reset_run_stats():
+    with _RUN_STATS_LOCK:
+        _RUN_STATS["feeds"] = {}
+        _RUN_STATS["stages"] = {}
+    # Cache hit/miss counters are per run too; the caches themselves carry over.
+    with _CACHE_STATS_LOCK:
+        _CACHE_STATS.clear()
+    with _LINK_CACHE_LOCK:
+        cache = _LINK_CACHE
+    if cache is not None:
+        cache.reset_counts()
+
+
+def record_fetch(rec):
+    with _RUN_STATS_LOCK:
+        _RUN_STATS["feeds"].setdefault(rec["url"], {}).update(rec)
+
+
+def record_feed_entries(url, label, parsed, kept):
+    with _RUN_STATS_LOCK:
+        _RUN_STATS["feeds"].setdefault(url, {"url": url}).update({"feed": label, "parsed": parsed, "kept": kept})
+
+
+def current_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(rss / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def run_stage(name, fn, *args, **kwargs):
+    tracing = STATS_TRACE_MEMORY and tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        entry = {"seconds": round(time.perf_counter() - start, 3), "max_rss_mb": current_rss_mb()}
+        if tracing:
+            # Stages that overlap in threads share one tracemalloc peak.
+            entry["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        with _RUN_STATS_LOCK:
+            _RUN_STATS["stages"][name] = entry
+
+
+def run_stats(run_started):
+    with _RUN_STATS_LOCK:
+        feeds = sorted((dict(v) for v in _RUN_STATS["feeds"].values()), key=lambda f: f.get("seconds", 0), reverse=True)
+        stages = dict(_RUN_STATS["stages"])
+    return {
+        "run_seconds": round(time.perf_counter() - run_started, 3),
+        "stages": stages,
+        "feeds": feeds,
+        "totals": {
+            "feeds": len(feeds),
+            "bytes": sum(f.get("bytes", 0) for f in feeds),
+            "retries": sum(f.get("retries", 0) for f in feeds),
+            "backoff_s": round(sum(f.get("backoff_s", 0) for f in feeds), 3),
+            "empty_feeds": sum(1 for f in feeds if not f.get("bytes")),
+            "skipped_open_circuit": sum(1 for f in feeds if f.get("status") == "circuit_open"),
+            "entries_parsed": sum(f.get("parsed", 0) for f in feeds),
+            "entries_kept": sum(f.get("kept", 0) for f in feeds),
+        },
+    }
+
+
+def prom_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(stats, finished_at):
+    lines = []
+
+    def metric(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_str = ",".join(f'{k}="{prom_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+    feeds = stats["feeds"]
+
+    def labels(f):
+        return {"feed": f.get("feed") or f["url"], "host": f.get("host", "")}
+
+    metric("aihm_run_seconds", "Wall time of the last run.", [({}, stats["run_seconds"])])
+    metric("aihm_last_run_timestamp_seconds", "Unix time the last run finished.", [({}, round(finished_at, 3))])
+    metric("aihm_stage_seconds", "Wall time per pipeline stage.", [({"stage": k}, v["seconds"]) for k, v in stats["stages"].items()])
+    metric("aihm_stage_max_rss_mb", "Process peak RSS when the stage finished.", [({"stage": k}, v.get("max_rss_mb")) for k, v in stats["stages"].items()])
+    metric("aihm_feed_fetch_seconds", "Wall time to fetch a feed, including retries.", [(labels(f), f.get("seconds")) for f in feeds])
+    metric("aihm_feed_bytes", "Bytes returned for a feed.", [(labels(f), f.get("bytes")) for f in feeds])
+    metric("aihm_feed_http_status", "Last HTTP status for a feed (0 on transport error).", [(labels(f), f["status"] if isinstance(f.get("status"), int) else 0) for f in feeds])
+    metric("aihm_feed_retries", "Retries spent on a feed.", [(labels(f), f.get("retries")) for f in feeds])
+    metric("aihm_feed_circuit_open", "1 when the feed was skipped by its circuit breaker.", [(labels(f), int(f.get("status") == "circuit_open")) for f in feeds])
+    metric("aihm_feed_backoff_seconds", "Time a feed spent sleeping in back-off.", [(labels(f), f.get("backoff_s")) for f in feeds])
+    metric("aihm_feed_entries_parsed", "Entries parsed from a feed.", [(labels(f), f.get("parsed")) for f in feeds])
+    metric("aihm_feed_entries_kept", "Entries kept from a feed after filtering and dedupe.", [(labels(f), f.get("kept")) for f in feeds])
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(stats):
+    if not METRICS_FILE:
+        return
+    finished_at = time.time()
+    if METRICS_FILE.endswith(".prom"):
+        write_file_atomic(METRICS_FILE, prometheus_text(stats, finished_at).encode("utf-8"))
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(METRICS_FILE)), exist_ok=True)
+    with open(METRICS_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"finished_at": round(finished_at, 3), **stats}, ensure_ascii=False) + "\n")
+
+
+# ---------- FETCH ENGINE ----------
+# Requests wait in a per-host queue, not in the shared pool: a job is handed to a worker only once its
+# host has a free slot and isn't backing off, so a slow or throttled host can't tie up every worker.
+# Retries and 429 back-offs go back on the queue on a timer instead of sleeping in a worker.
+class RetryLater(Exception):
+    def __init__(self, delay):
+        super().__init__(delay)
+        self.delay = delay
+
+
+class HostQueue:
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.jobs = deque()
+        self.resume_at = 0.0
+        self.timer = None
+
+
+_HOSTS = {}
+_HOSTS_LOCK = threading.Lock()
+_FETCH_POOL = None
+_FETCH_POOL_LOCK = threading.Lock()
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_CACHE_STATS = Counter()
+_CACHE_STATS_LOCK = threading.Lock()
+
+
+def host_key(url):
+    host = (urlparse(url).netloc or "").lower()
+    for prefix in ("www.", "old."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    for known in HOST_CONCURRENCY:
+        if host == known or host.endswith("." + known):
+            return known
+    return host
+
+
+def _host_queue(key):
+    # Caller holds _HOSTS_LOCK.
+    if key not in _HOSTS:
+        _HOSTS[key] = HostQueue(HOST_CONCURRENCY.get(key, DEFAULT_HOST_CONCURRENCY))
+    return _HOSTS[key]
+
+
+def back_off_host(url, seconds):
+    with _HOSTS_LOCK:
+        q = _host_queue(host_key(url))
+        q.resume_at = max(q.resume_at, time.monotonic() + seconds)
+
+
+def submit_host(url, fn, *args):
+    future = Future()
+    _enqueue(host_key(url), (future, fn, args))
+    return future
+
+
+def _enqueue(key, job, delay=0.0):
+    if delay > 0:
+        timer = threading.Timer(delay, _enqueue, (key, job))
+        timer.daemon = True
+        timer.start()
+        return
+    with _HOSTS_LOCK:
+        _host_queue(key).jobs.append(job)
+    _dispatch(key)
+
+
+def _resume(key):
+    with _HOSTS_LOCK:
+        _HOSTS[key].timer = None
+    _dispatch(key)
+
+
+def _dispatch(key):
+    ready = []
+    with _HOSTS_LOCK:
+        q = _HOSTS[key]
+        wait = q.resume_at - time.monotonic()
+        if wait > 0:
+            if q.jobs and q.timer is None:
+                q.timer = threading.Timer(wait, _resume, (key,))
+                q.timer.daemon = True
+                q.timer.start()
+            return
+        while q.jobs and q.active < q.limit:
+            q.active += 1
+            ready.append(q.jobs.popleft())
+    for job in ready:
+        fetch_pool().submit(_run_host_job, key, job)
+
+
+def _run_host_job(key, job):
+    future, fn, args = job
+    retry = None
+    try:
+        future.set_result(fn(*args))
+    except RetryLater as e:
+        retry = e.delay
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _HOSTS_LOCK:
+            _HOSTS[key].active -= 1
+        if retry is not None:
+            _enqueue(key, job, retry)
+        else:
+            _dispatch(key)
+
+
+def fetch_pool():
+    global _FETCH_POOL
+    with _FETCH_POOL_LOCK:
+        if _FETCH_POOL is None:
+            _FETCH_POOL = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+        return _FETCH_POOL
+
+
+def http_session():
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            # One keep-alive pool per host, sized to the largest per-host concurrency cap.
+            pool_size = max([DEFAULT_HOST_CONCURRENCY] + list(HOST_CONCURRENCY.values()))
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_size)
+            _SESSION = requests.Session()
+            _SESSION.headers.update(HEADERS)
+            _SESSION.mount("https://", adapter)
+            _SESSION.mount("http://", adapter)
+        return _SESSION
+
+
+def count_cache(event, n=1):
+    with _CACHE_STATS_LOCK:
+        _CACHE_STATS[event] += n
+
+
+def http_cache_paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, key + ".json"), os.path.join(HTTP_CACHE_DIR, key + ".body")
+
+
+def write_file_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def http_cache_get(url):
+    meta_path, body_path = http_cache_paths(url)
+    meta = load_json_if_exists(meta_path, None)
+    if not meta or meta.get("url") != url or not os.path.exists(body_path):
+        return None
+    return meta
+
+
+def http_cache_read_body(url, meta):
+    _, body_path = http_cache_paths(url)
+    try:
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except OSError:
+        return None
+    meta["used_at"] = time.time()
+    write_file_atomic(http_cache_paths(url)[0], json.dumps(meta).encode("utf-8"))
+    return body
+
+
+def http_cache_put(url, r):
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    meta_path, body_path = http_cache_paths(url)
+    try:
+        write_file_atomic(body_path, r.content)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "used_at": time.time(),
+            "size": len(r.content),
+        }
+        write_file_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        count_cache("stored")
+    except OSError:
+        count_cache("errors")
+
+
+def conditional_headers(meta):
+    headers = {}
+    if meta and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def prune_http_cache():
+    if not os.path.isdir(HTTP_CACHE_DIR):
+        return
+    entries = []
+    cutoff = time.time() - HTTP_CACHE_MAX_AGE_DAYS * 86400
+    for name in os.listdir(HTTP_CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        meta_path = os.path.join(HTTP_CACHE_DIR, name)
+        body_path = meta_path[:-len(".json")] + ".body"
+        meta = load_json_if_exists(meta_path, {}) or {}
+        entries.append((meta.get("used_at", 0), meta.get("size", 0), meta_path, body_path))
+    entries.sort(reverse=True)
+    budget = HTTP_CACHE_MAX_MB * 1024 * 1024
+    total = 0
+    for used_at, size, meta_path, body_path in entries:
+        total += size
+        if used_at >= cutoff and total <= budget:
+            continue
+        for path in (meta_path, body_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        count_cache("evicted")
+
+
+def http_cache_stats():
+    with _CACHE_STATS_LOCK:
+        stats = {k: _CACHE_STATS.get(k, 0) for k in ("hits", "misses", "stored", "evicted", "errors")}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+
+def retry_after_seconds(r, fallback):
+    try:
+        return max(float(r.headers.get("Retry-After", "")), fallback)
+    except (TypeError, ValueError):
+        return fallback
+
+
+class Fetch:
+    def __init__(self, url, retries, base_sleep, rec):
+        self.url = url
+        self.retries = retries
+        self.base_sleep = base_sleep
+        self.rec = rec
+        self.cached = http_cache_get(url)
+        self.start = time.perf_counter()
+
+    def attempt(self):
+        rec = self.rec
+        i = rec["attempts"]
+        rec["attempts"] += 1
         try:
-            r = requests.get(url, headers=HEADERS, timeout=30)
+            r = http_session().get(self.url, headers=conditional_headers(self.cached), timeout=30)
+            rec["status"] = r.status_code
             if r.status_code == 429:
-                time.sleep(base_sleep * (i + 2))
-                continue
+                # A 429 pauses every request to the host; other errors only delay this URL.
+                wait = retry_after_seconds(r, self.base_sleep * (i + 2))
+                back_off_host(self.url, wait)
+                rec["backoff_s"] += wait
+                return self.retry(0.0)
+            if r.status_code == 304 and self.cached:
+                body = http_cache_read_body(self.url, self.cached)
+                if body is not None:
+                    count_cache("hits")
+                    rec["cache"] = "hit"
+                    return self.finish(body)
+                self.cached = None
+                return self.retry(0.0)
             r.raise_for_status()
-            return r.content
-        except Exception:
-            if i == retries - 1:
-                return b""
-            time.sleep(base_sleep * (i + 1))
-    return b""
+            count_cache("misses")
+            rec["cache"] = "miss"
+            http_cache_put(self.url, r)
+            return self.finish(r.content)
+        except requests.RequestException as e:
+            if not isinstance(e, requests.HTTPError):
+                rec["status"] = type(e).__name__
+            rec["error"] = str(e)[:200]
+            # Client errors (blocked, gone) won't change on a retry a few seconds later.
+            if isinstance(rec["status"], int) and 400 <= rec["status"] < 500 and rec["status"] != 408:
+                return self.finish(b"")
+            return self.retry(self.base_sleep * (i + 1))
+
+    def retry(self, delay):
+        if self.rec["attempts"] >= self.retries:
+            return self.finish(b"")
+        self.rec["backoff_s"] += delay
+        raise RetryLater(delay)
+
+    def finish(self, body):
+        rec = self.rec
+        rec["seconds"] = round(time.perf_counter() - self.start, 3)
+        rec["bytes"] = len(body)
+        rec["retries"] = max(rec["attempts"] - 1, 0)
+        rec["backoff_s"] = round(rec["backoff_s"], 3)
+        record_fetch(rec)
+        feed_health().record(self.url, rec)
+        if body:
+            archive_put(self.url, body)
+        return body
+
+
+def done_future(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def submit_fetch(url, retries=3, base_sleep=1.0):
+    if not url:
+        return done_future(b"")
+    if _REPLAY is not None:
+        return done_future(replay_url(url))
+    rec = {"url": url, "host": host_key(url), "status": None, "attempts": 0, "backoff_s": 0.0, "cache": None}
+    circuit = feed_health().admit(url)
+    rec["circuit"] = circuit
+    if circuit == "open":
+        rec.update({"status": "circuit_open", "seconds": 0.0, "bytes": 0, "retries": 0})
+        record_fetch(rec)
+        return done_future(b"")
+    if circuit == "half_open":
+        # One probe, no back-off: a dead feed should cost a single request.
+        retries = 1
+    return submit_host(url, Fetch(url, retries, base_sleep, rec).attempt)
 
 
-def fetch_feed(url):
-    content = fetch_url(url)
+def fetch_url(url, retries=3, base_sleep=1.0):
+    # Blocks until the body arrives, so don't call it from a fetch-pool worker; use submit_fetch there.
+    return submit_fetch(url, retries, base_sleep).result()
+
+
+# ---------- FEED HEALTH ----------
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class FeedHealth:
+    # Per-URL fetch history plus a circuit breaker: closed -> open after BREAKER_FAILURES failures in a
+    # row, then a single half-open probe once the cool-down ends, doubling the cool-down each time it fails.
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        saved = load_json_if_exists(path, {}) or {}
+        cutoff = time.time() - FEED_HEALTH_MAX_AGE_DAYS * 86400
+        self.records = {u: r for u, r in saved.items() if isinstance(r, dict) and r.get("last_attempt", 0) >= cutoff}
+        self.dirty = len(self.records) != len(saved)
+
+    def admit(self, url):
+        with self.lock:
+            r = self.records.get(url)
+            if not r or r["state"] == "closed":
+                return "closed"
+            if time.time() < r["open_until"]:
+                return "open"
+            r["state"] = "half_open"
+            return "half_open"
+
+    def record(self, url, rec):
+        ok = isinstance(rec.get("status"), int) and rec["status"] < 400
+        now = time.time()
+        with self.lock:
+            r = self.records.setdefault(url, {
+                "state": "closed", "opens": 0, "open_until": 0, "consecutive_failures": 0,
+                "outcomes": [], "latencies": [], "last_error": None, "last_success": None,
+            })
+            r["last_attempt"] = round(now)
+            r["outcomes"] = (r["outcomes"] + [int(ok)])[-FEED_HEALTH_WINDOW:]
+            if ok:
+                r["latencies"] = (r["latencies"] + [rec.get("seconds", 0)])[-FEED_HEALTH_WINDOW:]
+                r.update({"state": "closed", "opens": 0, "open_until": 0, "consecutive_failures": 0, "last_success": round(now)})
+            else:
+                r["consecutive_failures"] += 1
+                r["last_error"] = f"{rec.get('status')}: {rec.get('error', '')}".rstrip(": ")
+                if r["state"] == "half_open" or r["consecutive_failures"] >= BREAKER_FAILURES:
+                    r["opens"] += 1
+                    cool_down = min(BREAKER_MAX_SECONDS, BREAKER_BASE_SECONDS * 2 ** (r["opens"] - 1))
+                    r.update({"state": "open", "open_until": round(now + cool_down)})
+            r["success_rate"] = round(sum(r["outcomes"]) / len(r["outcomes"]), 3)
+            r["p50_s"] = percentile(r["latencies"], 0.5)
+            r["p90_s"] = percentile(r["latencies"], 0.9)
+            self.dirty = True
+
+    def last_error(self, url):
+        with self.lock:
+            r = self.records.get(url)
+            if not r:
+                return None
+            if r["state"] == "open":
+                until = datetime.fromtimestamp(r["open_until"], timezone.utc).replace(microsecond=0).isoformat()
+                return f"circuit open until {until} after {r['consecutive_failures']} failures ({r['last_error']})"
+            return r["last_error"] if r["consecutive_failures"] else None
+
+    def save(self, labels=None):
+        with self.lock:
+            for url, label in (labels or {}).items():
+                if url in self.records and self.records[url].get("feed") != label:
+                    self.records[url]["feed"] = label
+                    self.dirty = True
+            if not self.dirty:
+                return
+            body = json.dumps(self.records, indent=1, sort_keys=True).encode("utf-8")
+            self.dirty = False
+        write_file_atomic(self.path, body)
+
+    def summary(self):
+        # Counts plus the feeds whose circuit isn't closed; the full history stays in FEED_HEALTH_FILE.
+        with self.lock:
+            states = Counter(r["state"] for r in self.records.values())
+            unhealthy = [
+                {"feed": r.get("feed") or url, "state": r["state"], "last_error": r["last_error"], "open_until": r["open_until"] or None}
+                for url, r in sorted(self.records.items()) if r["state"] != "closed"
+            ]
+            return {"feeds": len(self.records), "open": states["open"], "half_open": states["half_open"], "unhealthy": unhealthy}
+
+
+_FEED_HEALTH = None
+_FEED_HEALTH_LOCK = threading.Lock()
+
+
+def feed_health():
+    global _FEED_HEALTH
+    with _FEED_HEALTH_LOCK:
+        if _FEED_HEALTH is None:
+            _FEED_HEALTH = FeedHealth(FEED_HEALTH_FILE)
+        return _FEED_HEALTH
+
+
+def feed_labels():
+    with _RUN_STATS_LOCK:
+        return {url: f.get("feed") for url, f in _RUN_STATS["feeds"].items() if f.get("feed")}
+
+
+# ---------- RAW ARCHIVE ----------
+# Response bodies are stored once each under objects/ (gzip, named by sha256); runs/<run_id>.json maps
+# each fetched URL to its body and records the feed it was fetched as, so a run can be replayed offline.
+_ARCHIVE_RUN = None
+_ARCHIVE_LOCK = threading.Lock()
+_REPLAY = None
+
+
+def archive_object_path(digest):
+    return os.path.join(ARCHIVE_DIR, "objects", digest[:2], digest[2:] + ".gz")
+
+
+def start_archive_run():
+    global _ARCHIVE_RUN
+    if not ARCHIVE_DIR or _REPLAY is not None:
+        return
+    started = datetime.now(timezone.utc).replace(microsecond=0)
+    with _ARCHIVE_LOCK:
+        _ARCHIVE_RUN = {
+            "run_id": f"{started.strftime('%Y%m%dT%H%M%SZ')}-{os.getpid()}",
+            "started_at": started.isoformat(),
+            "feeds": {},
+            "responses": {},
+        }
+
+
+def archive_put(url, body):
+    with _ARCHIVE_LOCK:
+        if _ARCHIVE_RUN is None:
+            return
+    digest = hashlib.sha256(body).hexdigest()
+    path = archive_object_path(digest)
+    try:
+        if not os.path.exists(path):
+            write_file_atomic(path, gzip.compress(body, compresslevel=6, mtime=0))
+    except OSError as e:
+        print(f"Archive write failed for {url}: {e}")
+        return
+    with _ARCHIVE_LOCK:
+        if _ARCHIVE_RUN is not None:
+            _ARCHIVE_RUN["responses"][url] = digest
+
+
+def archive_feed(meta, label, url):
+    with _ARCHIVE_LOCK:
+        if _ARCHIVE_RUN is not None:
+            _ARCHIVE_RUN["feeds"][url] = {"label": label, "meta": meta}
+
+
+def finish_archive_run():
+    global _ARCHIVE_RUN
+    with _ARCHIVE_LOCK:
+        index, _ARCHIVE_RUN = _ARCHIVE_RUN, None
+    if index is None or not index["responses"]:
+        return None
+    index["finished_at"] = now_iso()
+    write_file_atomic(os.path.join(ARCHIVE_DIR, "runs", index["run_id"] + ".json"), compact_json(index))
+    prune_archive()
+    return index["run_id"]
+
+
+def archived_runs():
+    runs_dir = os.path.join(ARCHIVE_DIR, "runs")
+    if not ARCHIVE_DIR or not os.path.isdir(runs_dir):
+        return []
+    return sorted(os.path.join(runs_dir, f) for f in os.listdir(runs_dir) if f.endswith(".json"))
+
+
+def run_date(path):
+    return os.path.basename(path)[:8]
+
+
+def prune_archive():
+    if ARCHIVE_RETENTION_DAYS <= 0:
+        return
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=ARCHIVE_RETENTION_DAYS)).strftime("%Y%m%d")
+    runs = archived_runs()
+    expired = [p for p in runs if run_date(p) < cutoff]
+    if not expired:
+        return
+    for p in expired:
+        os.remove(p)
+    # Sweep bodies no remaining run refers to.
+    live = set()
+    for p in archived_runs():
+        live.update((load_json_if_exists(p, {}) or {}).get("responses", {}).values())
+    objects_dir = os.path.join(ARCHIVE_DIR, "objects")
+    for sub in os.listdir(objects_dir) if os.path.isdir(objects_dir) else []:
+        for name in os.listdir(os.path.join(objects_dir, sub)):
+            if sub + name[:-3] not in live:
+                os.remove(os.path.join(objects_dir, sub, name))
+
+
+def select_archived_runs(selector):
+    runs = archived_runs()
+    selector = (selector or "").strip()
+    if selector == "latest":
+        return runs[-1:]
+    m = re.fullmatch(r"(\d{4}-\d{2}-\d{2})(?:\.\.(\d{4}-\d{2}-\d{2}))?", selector)
+    if m:
+        first = m.group(1).replace("-", "")
+        last = (m.group(2) or m.group(1)).replace("-", "")
+        return [p for p in runs if first <= run_date(p) <= last]
+    return [p for p in runs if os.path.basename(p)[:-5] == selector]
+
+
+def replay_url(url):
+    digest = _REPLAY["responses"].get(url)
+    body = b""
+    if digest:
+        with open(archive_object_path(digest), "rb") as f:
+            body = gzip.decompress(f.read())
+    record_fetch({"url": url, "host": host_key(url), "status": "archived" if body else "not_archived", "seconds": 0.0, "bytes": len(body)})
+    return body
+
+
+def replay_jobs(prefix):
+    return [(feed["meta"], feed["label"], url) for url, feed in _REPLAY["feeds"].items() if feed["label"].startswith(prefix)]
+
+
+def reprocess_run(index_path, out_root):
+    # Runs in its own process: the settings below only change this process's copy of the module.
+    global _REPLAY, OUTPUT_DIR, OUTPUT_MODE, DELTA_DIR, ITEM_STORE_PATH, METRICS_FILE, RELEASE_SOURCES
+    _REPLAY = load_json_if_exists(index_path, None)
+    if not _REPLAY:
+        return {"run": os.path.basename(index_path), "error": "unreadable run index"}
+    OUTPUT_DIR = os.path.join(out_root, _REPLAY["run_id"])
+    OUTPUT_MODE = "single"
+    DELTA_DIR = ""
+    ITEM_STORE_PATH = ""
+    METRICS_FILE = ""
+    RELEASE_SOURCES = [(name, url) for name, _, url in replay_jobs("release:")]
+    forum_feeds = [cfg for cfg, _, _ in replay_jobs("forum:")]
+    payload = run(forum_feeds=forum_feeds)
+    return {"run": _REPLAY["run_id"], "items": {k: len(v) for k, v in payload["sections"].items()}}
+
+
+def reprocess(selector):
+    runs = select_archived_runs(selector)
+    if not runs:
+        raise SystemExit(f"No archived runs match {selector!r} in {ARCHIVE_DIR}")
+    out_root = os.path.join(OUTPUT_DIR, "reprocessed")
+    print(f"Reprocessing {len(runs)} archived run(s) into {out_root}")
+    if len(runs) == 1:
+        results = [reprocess_run(runs[0], out_root)]
+    else:
+        with ProcessPoolExecutor(max_workers=max(1, min(REPROCESS_WORKERS, len(runs)))) as pool:
+            results = list(pool.map(reprocess_run, runs, [out_root] * len(runs)))
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    return results
+
+
+# ---------- FEED PARSING ----------
+ENTRY_TAGS = ("item", "entry")
+CHAR_REF_RE = re.compile(r"&#(x[0-9a-fA-F]+|[0-9]+);")
+# Elements from other namespaces (media:title, itunes:title, ...) are extensions, not the entry's own
+# fields; only Dublin Core dates are mapped in, as feedparser does.
+FEED_NAMESPACES = {"http://www.w3.org/2005/Atom", "http://purl.org/atom/ns#", "http://purl.org/rss/1.0/"}
+EXTENSION_FIELDS = {
+    "{http://purl.org/dc/elements/1.1/}date": "date",
+    "{http://purl.org/dc/terms/}issued": "issued",
+    "{http://purl.org/dc/terms/}modified": "modified",
+}
+
+
+def tag_name(tag):
+    if not isinstance(tag, str):
+        return ""
+    if tag.startswith("{"):
+        ns, _, name = tag[1:].partition("}")
+        return name.lower() if ns in FEED_NAMESPACES else EXTENSION_FIELDS.get(tag, "")
+    return tag.lower()
+
+
+def element_text(el):
+    kind = (el.get("type") or "").lower()
+    if kind in ("xhtml", "application/xhtml+xml"):
+        text = "".join(el.itertext())
+    else:
+        text = el.text or ""
+    if kind in ("html", "text/html"):
+        # Match feedparser: decode character references, keep named entities and markup.
+        text = CHAR_REF_RE.sub(lambda m: chr(int(m.group(1)[1:], 16) if m.group(1)[0] in "xX" else int(m.group(1))), text)
+    return text.strip()
+
+
+def new_entry():
+    return SimpleNamespace(title="", link="", source=None, published="", updated="", _guid="", _alt_link="")
+
+
+def take_entry_field(entry, name, el):
+    if name == "title":
+        entry.title = element_text(el)
+    elif name == "link":
+        href = el.get("href")
+        if href is None:
+            entry.link = entry.link or (el.text or "").strip()
+        elif (el.get("rel") or "alternate") == "alternate":
+            entry.link = entry.link or href
+        else:
+            entry._alt_link = entry._alt_link or href
+    elif name in ("pubdate", "published", "issued"):
+        entry.published = entry.published or (el.text or "").strip()
+    elif name in ("updated", "modified", "date"):
+        entry.updated = entry.updated or (el.text or "").strip()
+    elif name == "guid" and (el.get("isPermaLink") or "true").lower() != "false":
+        entry._guid = (el.text or "").strip()
+    elif name == "source" and el.text and el.text.strip():
+        entry.source = SimpleNamespace(title=el.text.strip(), href=el.get("url", ""))
+
+
+def finish_entry(entry):
+    entry.link = entry.link or entry._guid or entry._alt_link
+    entry.updated = entry.updated or entry.published
+    del entry._guid, entry._alt_link
+    return entry
+
+
+def iter_feed_entries(content, chunk_size=64 * 1024):
+    # Pulls only the fields the builders read and frees each item once it is yielded.
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    entry = None
+    entry_depth = 0
+    for offset in range(0, len(content), chunk_size):
+        parser.feed(content[offset:offset + chunk_size])
+        for event, el in parser.read_events():
+            name = tag_name(el.tag)
+            if event == "start":
+                stack.append(name)
+                if entry is None and name in ENTRY_TAGS:
+                    entry, entry_depth = new_entry(), len(stack)
+                continue
+            depth = len(stack)
+            stack.pop()
+            if entry is None:
+                continue
+            if depth == entry_depth:
+                yield finish_entry(entry)
+                entry = None
+                el.clear()
+            elif depth == entry_depth + 1:
+                take_entry_field(entry, name, el)
+            elif depth == entry_depth + 2 and name == "title" and stack[entry_depth] == "source":
+                entry.source = SimpleNamespace(title=element_text(el), href="")
+    parser.close()
+
+
+class StreamedFeed:
+    def __init__(self, content):
+        self.content = content
+        self.bozo = 0
+        self.bozo_exception = None
+
+    @property
+    def entries(self):
+        return self._iter_entries()
+
+    def _iter_entries(self):
+        if not self.content:
+            return
+        yielded = 0
+        try:
+            for entry in iter_feed_entries(self.content):
+                yielded += 1
+                yield entry
+        except ET.ParseError as e:
+            # Malformed XML: let feedparser's lenient parser finish the job.
+            fallback = feedparser.parse(self.content)
+            self.bozo = 1
+            self.bozo_exception = fallback.get("bozo_exception") or e
+            for entry in fallback.entries[yielded:]:
+                yield entry
+
+
+def parse_feed(url, content):
+    if FEED_PARSER == "fast":
+        feed = StreamedFeed(content)
+    else:
+        feed = feedparser.parse(content or b"")
     if not content:
-        return feedparser.parse(b"")
-    return feedparser.parse(content)
+        error = feed_health().last_error(url)
+        if error:
+            feed.bozo, feed.bozo_exception = 1, error
+    return feed
+
+
+def iter_feeds(urls):
+    # Yields feeds in order, each as soon as it has arrived, while the rest are still in flight.
+    futures = [(url, submit_fetch(url)) for url in urls]
+    for url, f in futures:
+        yield parse_feed(url, f.result())
 
 
 def strip_source_suffix(title):
@@ -158,13 +1231,6 @@ def query_keywords(q):
     return out[:16]
 
 
-def relevance_score(title, keywords):
-    t = norm_text(title)
-    if not t:
-        return 0
-    return sum(1 for kw in keywords if kw in t)
-
-
 def fingerprint_title(title):
     t = norm_text(strip_source_suffix(title or ""))
     for w in ["ai", "artificial intelligence", "model", "models", "llm", "chatbot", "chatbots"]:
@@ -173,208 +1239,1241 @@ def fingerprint_title(title):
     return t
 
 
-def uk_score_for_item(title, link, source):
-    t = f" {norm_text(title)} "
-    s = f" {norm_text(source)} "
-    u = f" {link or ''} ".lower()
-    score = 0
-    for tok in UK_TOKENS:
-        if tok in t or tok in s or tok.strip() in u:
-            score += 1
-    return min(score, 3)
+def themes_sentence(kws):
+    return "Recurring themes: " + ", ".join(kws) + "." if kws else "No clear recurring themes detected."
+
 
+# ---------- LINK RESOLUTION ----------
+GOOGLE_NEWS_ARTICLE_RE = re.compile(r"^/(?:rss/)?articles/([A-Za-z0-9_-]+)")
+GOOGLE_NEWS_TARGET_RE = re.compile(rb'data-n-au="(https?://[^"]+)"')
 
-def extract_keywords(text, max_words=6):
-    words = re.findall(r"[a-z]{4,}", (text or "").lower())
-    words = [w for w in words if w not in STOPWORDS]
-    freq = Counter(words)
-    return [w for w, _ in freq.most_common(max_words)]
 
+class LinkCache:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        saved = load_json_if_exists(path, {}) or {}
+        now = time.time()
+        self.entries = {k: v for k, v in saved.items() if isinstance(v, dict) and self.fresh(v, now)}
+        self.dirty = len(self.entries) != len(saved)
+        self.counts = Counter()
 
-def summarize_list(titles, max_kws=7):
-    joined = " ".join(titles[:30])
-    kws = extract_keywords(joined, max_words=max_kws)
-    return "Recurring themes: " + ", ".join(kws) + "." if kws else "No clear recurring themes detected."
+    @staticmethod
+    def fresh(entry, now):
+        ttl = LINK_CACHE_TTL_DAYS if entry.get("url") else LINK_CACHE_MISS_TTL_DAYS
+        return now - entry.get("at", 0) < ttl * 86400
+
+    def get(self, link):
+        with self.lock:
+            entry = self.entries.get(link)
+            if entry is None or not self.fresh(entry, time.time()):
+                return None
+            return entry["url"]
+
+    def put(self, link, url):
+        with self.lock:
+            self.entries[link] = {"url": url, "at": round(time.time())}
+            self.dirty = True
+
+    def count(self, event, n=1):
+        with self.lock:
+            self.counts[event] += n
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts.clear()
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            body = compact_json(self.entries)
+            self.dirty = False
+        write_file_atomic(self.path, body)
 
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), **self.counts}
 
-def looks_like_release(title):
-    t = (title or "").lower()
-    if any(x in t for x in RELEASE_EXCLUDE):
-        return False
-    return any(x in t for x in RELEASE_INCLUDE)
-
-
-def derive_subtype(title, category):
-    t = norm_text(title)
-    if any(x in t for x in ["fraud", "scam", "money laundering", "phishing", "impersonation", "voice clone"]):
-        return "Impersonation / phishing / scam scripts"
-    if any(x in t for x in ["csam", "child abuse", "child sexual", "grooming"]):
-        return "CSAM / CSEA"
-    if any(x in t for x in ["ncii", "synthetic image", "deepfake abuse", "image abuse", "intimate image", "revenge porn"]):
-        return "NCII / sexualised deepfake imagery"
-    if any(x in t for x in ["stalking", "harassment", "coercion", "sextortion", "audio abuse"]):
-        return "VAWG / stalking / harassment / coercion"
-    if any(x in t for x in ["terrorist", "extremist", "radicalisation", "radicalization", "propaganda", "recruitment"]):
-        return "Propaganda / radicalisation / recruitment"
-    if any(x in t for x in ["attack planning", "attack preparation", "crime instructions", "weapon", "explosive"]):
-        return "Attack planning / operational guidance"
-    if any(x in t for x in ["drugs", "firearms", "weapons", "illicit items", "dark web", "counterfeit"]):
-        return "Illegal items / drugs / firearms"
-    if any(x in t for x in ["ransomware", "malware", "jailbreak", "prompt injection", "exploit"]):
-        return "Cyber-enabled criminal methods / attack enablement"
-    if any(x in t for x in ["false evidence", "identity documents", "court", "bank statements", "birth certificates", "border", "immigration"]):
-        return "Evidential risk / false documents / border exploitation"
-    if category == "RA09 – AI use in financial crime, fraud and exploitation":
-        return "General fraud / financial crime"
-    if category == "RA11 – AI Use for Sexual Crime and Abuse":
-        return "General sexual crime / abuse"
-    if category == "RA13 – AI use in terrorism":
-        return "General terrorism / extremism use case"
-    if category == "RA14 – AI increases illegal item creation and acquisition":
-        return "General illegal item / crime-enablement use case"
-    if category == "Cross-cutting / unassigned":
-        return "Legacy / cross-cutting"
-    return "Other"
-
-
-def assign_harm_category_from_text(title, harm_query_map):
-    t = norm_text(title)
-    best_cat = None
-    best = 0
-    for cat, q in harm_query_map.items():
-        kws = query_keywords(q)
-        score = sum(1 for kw in kws if kw in t)
-        if score > best:
-            best = score
-            best_cat = cat
-    if best_cat and best >= 2:
-        return best_cat, best
-    return None, 0
-
-
-def build_harm_items(harm_queries):
-    items = []
+
+_LINK_CACHE = None
+_LINK_CACHE_LOCK = threading.Lock()
+
+
+def link_cache():
+    global _LINK_CACHE
+    with _LINK_CACHE_LOCK:
+        if _LINK_CACHE is None:
+            _LINK_CACHE = LinkCache(LINK_CACHE_FILE)
+        return _LINK_CACHE
+
+
+def is_google_news_link(url):
+    p = urlparse(url or "")
+    return host_key(url) == host_key(GOOGLE_NEWS_RSS_SEARCH) and bool(GOOGLE_NEWS_ARTICLE_RE.match(p.path))
+
+
+def decode_google_news_link(url):
+    m = GOOGLE_NEWS_ARTICLE_RE.match(urlparse(url).path)
+    if not m:
+        return None
+    token = m.group(1)
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except ValueError:
+        return None
+    # Older article ids are a small protobuf: 08 13 22, a varint length, then the target URL.
+    # Newer ones are opaque and need the HTTP fallback.
+    if not raw.startswith(b"\x08\x13\x22"):
+        return None
+    pos, length, shift = 3, 0, 0
+    while pos < len(raw):
+        byte = raw[pos]
+        pos += 1
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    target = raw[pos:pos + length].decode("utf-8", "ignore")
+    return target if target.startswith(("http://", "https://")) else None
+
+
+def fetch_google_link_target(url):
+    # Returns the target URL, "" when Google gave no usable target, or None on a transient failure.
+    try:
+        r = http_session().get(url, timeout=20, allow_redirects=True, stream=True)
+        with r:
+            if r.status_code == 429:
+                back_off_host(url, retry_after_seconds(r, 5.0))
+                return None
+            if r.status_code >= 500:
+                return None
+            if r.status_code >= 400:
+                return ""
+            # Redirected off Google: stop at the publisher's headers rather than downloading the page.
+            if host_key(r.url) != host_key(url):
+                return r.url
+            m = GOOGLE_NEWS_TARGET_RE.search(r.content)
+            return html.unescape(m.group(1).decode("utf-8", "ignore")) if m else ""
+    except requests.RequestException:
+        return None
+
+
+def resolve_links(items, fetch=True):
+    fetch = fetch and _REPLAY is None
+    cache = link_cache()
+    targets = {}
+    pending = {}
+    ranked = Counter()
+    wider = {}
+    # Highest-ranked items first: only links likely to be shown are worth a network lookup.
+    for it in sorted(items, key=lambda x: (x.get("uk_score", 0), x.get("relevance_score", 0), x.get("timestamp", 0)), reverse=True):
+        link = it.get("link", "")
+        ranked[it.get("category")] += 1
+        if link in targets or link in pending or not is_google_news_link(link):
+            continue
+        cached = cache.get(link)
+        if cached is not None:
+            if fetch:
+                cache.count("hits")
+            targets[link] = cached
+            continue
+        decoded = decode_google_news_link(link)
+        if decoded:
+            cache.count("decoded")
+            cache.put(link, decoded)
+            targets[link] = decoded
+        elif fetch and ranked[it.get("category")] <= MAX_PER_HARM:
+            pending[link] = True
+        elif fetch and ranked[it.get("category")] <= RESOLVE_PER_CATEGORY:
+            wider[link] = True
+    # Links every category will publish come first; the rest of the budget goes to the wider pool.
+    pending = list(pending) + [link for link in wider if link not in pending]
+    deferred = pending[RESOLVE_MAX_PER_RUN:]
+    pending = pending[:RESOLVE_MAX_PER_RUN]
+    futures = [submit_host(link, fetch_google_link_target, link) for link in pending]
+    for link, target in zip(pending, (f.result() for f in futures)):
+        cache.count("fetched" if target else "failed")
+        if target is not None:
+            cache.put(link, target)
+            targets[link] = target
+    cache.count("deferred", len(deferred))
+    for it in items:
+        target = targets.get(it.get("link", ""))
+        if target:
+            it["google_link"] = it["link"]
+            it["link"] = clean_url(target)
+    if fetch:
+        cache.save()
+    return items
+
+
+def dedupe_by_link(items):
     seen = set()
-    errors = {}
-    for category, query in harm_queries.items():
-        url = google_rss_url(query, TIME_WINDOW)
-        feed = fetch_feed(url)
-        if getattr(feed, "bozo", 0):
-            errors[f"google:{category}"] = str(getattr(feed, "bozo_exception", "feed parse error"))
-        keywords = query_keywords(query)
-        for e in getattr(feed, "entries", []):
-            title = strip_source_suffix(getattr(e, "title", "") or "")
-            if not title:
-                continue
-            link = clean_url(getattr(e, "link", "") or "")
-            source = getattr(getattr(e, "source", None), "title", "") or "Google News"
-            date_str = getattr(e, "published", "") or getattr(e, "updated", "") or ""
-            dt = parse_date(date_str)
-            fp = f"{category}::{fingerprint_title(title)}"
-            if fp in seen:
-                continue
-            seen.add(fp)
-            rel = relevance_score(title, keywords)
-            uk_score = uk_score_for_item(title, link, source)
-            items.append({
-                "category": category,
-                "title": title,
-                "link": link,
-                "source": source,
-                "timestamp": dt.timestamp(),
-                "date": dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
-                "relevance_score": rel,
-                "uk_score": uk_score,
-                "uk_relevance": uk_score >= 2,
-                "harm_subtype": derive_subtype(title, category),
-            })
-    by_cat = defaultdict(list)
+    out = []
     for it in items:
-        by_cat[it["category"]].append(it)
+        key = (it.get("category"), it.get("link"))
+        if it.get("link") and key in seen:
+            continue
+        seen.add(key)
+        out.append(it)
+    return out
+
+
+# ---------- CLASSIFIER ----------
+class PatternMatcher:
+    def __init__(self, tagged_patterns):
+        tags = defaultdict(set)
+        for pattern, tag in tagged_patterns:
+            if pattern:
+                tags[pattern].add(tag)
+        patterns = sorted(tags, key=len, reverse=True)
+        # Every pattern that matches at a position is a prefix of the longest one that
+        # does, so one lookahead per position plus the prefix closure reproduces the
+        # old `pattern in text` checks for all patterns at once.
+        self.closure = {p: set().union(*(tags[q] for q in patterns if p.startswith(q))) for p in patterns}
+        self.regex = re.compile("(?=(" + "|".join(re.escape(p) for p in patterns) + "))") if patterns else None
+
+    def tags(self, text):
+        found = set()
+        if self.regex is None or not text:
+            return found
+        for m in self.regex.finditer(text):
+            found |= self.closure[m.group(1)]
+        return found
+
+
+class Classifier:
+    def __init__(self, harm_queries):
+        self.keywords = {cat: query_keywords(harm_query_text(q)) for cat, q in harm_queries.items()}
+        title_patterns = [(tok, ("uk", tok)) for tok in UK_TOKENS]
+        for idx, (_, patterns) in enumerate(SUBTYPE_RULES):
+            title_patterns += [(p, ("subtype", idx)) for p in patterns]
+        title_patterns += [(norm_text(p), ("release", True)) for p in RELEASE_INCLUDE]
+        title_patterns += [(norm_text(p), ("release", False)) for p in RELEASE_EXCLUDE]
+        for cat, kws in self.keywords.items():
+            title_patterns += [(kw, ("category", cat, kw)) for kw in kws]
+        self.title_matcher = PatternMatcher(title_patterns)
+        self.source_matcher = PatternMatcher([(tok, tok) for tok in UK_TOKENS])
+        self.link_matcher = PatternMatcher([(tok.strip(), tok) for tok in UK_TOKENS])
+
+    def classify(self, title, link="", source=""):
+        tags = self.title_matcher.tags(f" {norm_text(title)} ")
+        uk_hits = {t[1] for t in tags if t[0] == "uk"}
+        if source:
+            uk_hits |= self.source_matcher.tags(f" {norm_text(source)} ")
+        if link:
+            uk_hits |= self.link_matcher.tags(f" {link} ".lower())
+        rules = [t[1] for t in tags if t[0] == "subtype"]
+        release = {t[1] for t in tags if t[0] == "release"}
+        return {
+            "subtype_rule": SUBTYPE_RULES[min(rules)][0] if rules else None,
+            "uk_score": min(len(uk_hits), 3),
+            "release": True in release and False not in release,
+            "category_scores": Counter(t[1] for t in tags if t[0] == "category"),
+        }
+
+    def subtype(self, result, category):
+        return result["subtype_rule"] or CATEGORY_SUBTYPE_FALLBACKS.get(category, "Other")
+
+    def best_category(self, result, min_score=2):
+        best_cat, best = None, 0
+        for cat in self.keywords:
+            score = result["category_scores"].get(cat, 0)
+            if score > best:
+                best_cat, best = cat, score
+        if best_cat and best >= min_score:
+            return best_cat, best
+        return None, 0
+
+
+_CLASSIFIERS = {}
+
+
+def build_classifier(harm_queries):
+    key = json.dumps(harm_queries, sort_keys=True)
+    if key not in _CLASSIFIERS:
+        _CLASSIFIERS[key] = Classifier(harm_queries)
+    return _CLASSIFIERS[key]
+
+
+# ---------- TERM ANALYTICS ----------
+def singular(word):
+    if len(word) <= 4 or not word.endswith("s") or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def title_terms(text):
+    return [singular(w) for w in re.findall(r"[a-z]{4,}", (text or "").lower()) if w not in STOPWORDS]
+
+
+def category_terms(spec):
+    return [singular(kw) for kw in query_keywords(harm_query_text(spec))]
+
+
+class TermMatrix:
+    # One TF-IDF matrix (rows L2-normalised) over a batch of titles. Uses scipy.sparse when it is
+    # installed and falls back to dict rows otherwise; both give the same scores.
+    def __init__(self, texts):
+        docs = [Counter(title_terms(t)) for t in texts]
+        self.vocab = {}
+        df = Counter()
+        for doc in docs:
+            for term in doc:
+                self.vocab.setdefault(term, len(self.vocab))
+            df.update(doc.keys())
+        self.terms = list(self.vocab)
+        self.n_docs = len(docs)
+        self.idf = [math.log((1 + self.n_docs) / (1 + df[t])) + 1 for t in self.terms]
+        self.unseen_idf = math.log(1 + self.n_docs) + 1
+        if sparse is not None:
+            self.matrix = self.sparse_rows(docs)
+        else:
+            self.rows = [self.dict_row(doc) for doc in docs]
+
+    def weights(self, counts):
+        return [(self.vocab.get(t), tf * (self.idf[self.vocab[t]] if t in self.vocab else self.unseen_idf)) for t, tf in counts.items()]
+
+    def dict_row(self, counts):
+        weights = self.weights(counts)
+        norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+        # Terms outside the vocabulary still count towards the norm; they just never match.
+        return {col: w / norm for col, w in weights if col is not None}
+
+    def sparse_rows(self, docs):
+        row_ids, cols, data, norms = [], [], [], []
+        for r, counts in enumerate(docs):
+            weights = self.weights(counts)
+            norms.append(math.sqrt(sum(w * w for _, w in weights)) or 1.0)
+            for col, w in weights:
+                if col is not None:
+                    row_ids.append(r)
+                    cols.append(col)
+                    data.append(w)
+        data = np.asarray(data, dtype=np.float64) / np.asarray(norms)[np.asarray(row_ids, dtype=np.int64)] if data else []
+        return sparse.csr_matrix((data, (row_ids, cols)), shape=(len(docs), len(self.terms)))
+
+    def similarity(self, queries):
+        # Cosine of every document against every query, as a list of per-document score lists.
+        queries = [Counter(q) for q in queries]
+        if sparse is not None:
+            q = self.sparse_rows(queries)
+            return (self.matrix @ q.T).toarray().tolist()
+        q_rows = [self.dict_row(qc) for qc in queries]
+        return [[sum(w * qr.get(col, 0.0) for col, w in row.items()) for qr in q_rows] for row in self.rows]
+
+    def group_terms(self, groups, k=THEME_TERMS):
+        # Highest summed TF-IDF terms for each group of document indices.
+        if sparse is not None:
+            g_rows = [g for g, docs in enumerate(groups) for _ in docs]
+            g_cols = [d for docs in groups for d in docs]
+            indicator = sparse.csr_matrix((np.ones(len(g_cols)), (g_rows, g_cols)), shape=(len(groups), self.n_docs))
+            summed = indicator @ self.matrix
+            out = []
+            for g in range(len(groups)):
+                start, end = summed.indptr[g], summed.indptr[g + 1]
+                pairs = zip(summed.data[start:end].tolist(), summed.indices[start:end].tolist())
+                out.append([self.terms[c] for w, c in sorted(pairs, key=lambda p: (-round(p[0], 9), self.terms[p[1]]))[:k]])
+            return out
+        out = []
+        for docs in groups:
+            summed = Counter()
+            for d in docs:
+                summed.update(self.rows[d])
+            out.append([self.terms[c] for c, w in sorted(summed.items(), key=lambda p: (-round(p[1], 9), self.terms[p[0]]))[:k]])
+        return out
+
+
+def categorise_by_similarity(titles, harm_queries, min_similarity, min_terms=1):
+    cats = list(harm_queries)
+    if not titles or not cats:
+        return [(None, 0.0)] * len(titles)
+    queries = [category_terms(harm_queries[c]) for c in cats]
+    query_sets = [set(q) for q in queries]
+    sims = TermMatrix(titles).similarity(queries)
     out = []
-    for cat, vals in by_cat.items():
-        vals = sorted(vals, key=lambda x: (x.get("uk_score", 0), x.get("relevance_score", 0), x.get("timestamp", 0)), reverse=True)
-        out.extend(vals[:MAX_PER_HARM])
-    return out, errors
+    for title, scores in zip(titles, sims):
+        # A single shared generic term ("chatbot", "attack") is not enough to place a title.
+        terms = set(title_terms(title))
+        eligible = [i for i in range(len(cats)) if len(terms & query_sets[i]) >= min_terms and scores[i] >= min_similarity]
+        if eligible:
+            best = max(eligible, key=lambda i: scores[i])
+            out.append((cats[best], scores[best]))
+        else:
+            out.append((None, max(scores)))
+    return out
+
+
+# ---------- ITEM STORE ----------
+# trend_counts holds per-hour and per-day counts of new harm and forum items by category, subtype and
+# source, keyed by publication time. Each upsert adds only what it inserted, and items pruned from the
+# items table keep their counts.
+TREND_KINDS = ("harm", "forum")
+TREND_RESOLUTIONS = (("hour", 3600), ("day", 86400))
+
+
+def trend_dims(it):
+    dims = [
+        ("all", ""),
+        ("category", it.get("category") or "Cross-cutting / unassigned"),
+        ("subtype", it.get("harm_subtype")),
+        ("source", it.get("source")),
+    ]
+    return [(dim, value) for dim, value in dims if value is not None]
+
+
+class ItemStore:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        has_trends = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'trend_counts'").fetchone()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                category TEXT,
+                timestamp REAL NOT NULL,
+                uk_score INTEGER NOT NULL DEFAULT 0,
+                relevance_score INTEGER NOT NULL DEFAULT 0,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_kind_time ON items (kind, timestamp);
+            CREATE INDEX IF NOT EXISTS items_kind_category_rank
+                ON items (kind, category, uk_score, relevance_score, timestamp);
+            CREATE TABLE IF NOT EXISTS trend_counts (
+                resolution TEXT NOT NULL,
+                dim TEXT NOT NULL,
+                value TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                uk_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (resolution, dim, value, bucket)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS trend_counts_bucket ON trend_counts (resolution, bucket);
+        """)
+        self.new_items = defaultdict(list)
+        if not has_trends:
+            self.backfill_trends()
+
+    def add_trends(self, items, seen_at):
+        counts = defaultdict(lambda: [0, 0])
+        for it in items:
+            ts = it.get("timestamp") or seen_at
+            uk = 1 if it.get("uk_relevance") else 0
+            for dim, value in trend_dims(it):
+                for resolution, size in TREND_RESOLUTIONS:
+                    c = counts[(resolution, dim, value, int(ts // size * size))]
+                    c[0] += 1
+                    c[1] += uk
+        self.conn.executemany(
+            "INSERT INTO trend_counts (resolution, dim, value, bucket, count, uk_count) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (resolution, dim, value, bucket) DO UPDATE SET "
+            "count = count + excluded.count, uk_count = uk_count + excluded.uk_count",
+            [(*key, n, uk) for key, (n, uk) in counts.items()],
+        )
+
+    def backfill_trends(self):
+        # One-off for stores created before trend_counts existed.
+        with self.lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT data, first_seen FROM items WHERE kind IN (%s)" % ",".join("?" * len(TREND_KINDS)), TREND_KINDS
+            )
+            for batch in chunked(rows, ITEM_STORE_BATCH):
+                for data, first_seen in batch:
+                    self.add_trends([json.loads(data)], first_seen)
+
+    def upsert(self, kind, items):
+        seen_at = time.time()
+        new = []
+        with self.lock, self.conn:
+            for it in items:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO items (id, kind, category, timestamp, uk_score, relevance_score, first_seen, last_seen, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        it["id"], kind, it.get("category"), it.get("timestamp", 0),
+                        it.get("uk_score", 0), it.get("relevance_score", 0), seen_at, seen_at,
+                        json.dumps(it, ensure_ascii=False),
+                    ),
+                )
+                if cur.rowcount:
+                    new.append(it)
+            self.conn.executemany(
+                "UPDATE items SET last_seen = ? WHERE id = ?",
+                [(seen_at, it["id"]) for it in items],
+            )
+            if kind in TREND_KINDS and new:
+                self.add_trends(new, seen_at)
+        self.new_items[kind].extend(new)
+        return new
+
+    def top_harms(self, categories, since, limit):
+        out = []
+        with self.lock:
+            known = [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT category FROM items WHERE kind = 'harm' AND timestamp >= ?", (since,)
+            )]
+            for cat in list(categories) + [c for c in known if c not in categories]:
+                rows = self.conn.execute(
+                    "SELECT data FROM items WHERE kind = 'harm' AND category = ? AND timestamp >= ? "
+                    "ORDER BY uk_score DESC, relevance_score DESC, timestamp DESC, rowid LIMIT ?",
+                    (cat, since, limit),
+                )
+                out.extend(json.loads(row[0]) for row in rows)
+        return out
+
+    def latest(self, kind, since, limit):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT data FROM items WHERE kind = ? AND timestamp >= ? ORDER BY timestamp DESC, rowid LIMIT ?",
+                (kind, since, limit),
+            )
+            return [json.loads(row[0]) for row in rows]
+
+    def prune(self):
+        if ITEM_STORE_RETENTION_DAYS <= 0:
+            return 0
+        now = time.time()
+        cutoff = now - ITEM_STORE_RETENTION_DAYS * 86400
+        hourly_days = max(TREND_HOURLY_RETENTION_DAYS, TREND_WINDOW_HOURS / 24 + 1)
+        daily_days = max(TREND_DAILY_RETENTION_DAYS, TREND_BASELINE_DAYS + 2)
+        with self.lock, self.conn:
+            for resolution, days in (("hour", hourly_days), ("day", daily_days)):
+                self.conn.execute(
+                    "DELETE FROM trend_counts WHERE resolution = ? AND bucket < ?", (resolution, now - days * 86400)
+                )
+            return self.conn.execute("DELETE FROM items WHERE last_seen < ? AND timestamp < ?", (cutoff, cutoff)).rowcount
+
+    def trend_scores(self, now=None):
+        # Recent counts come from hourly buckets and the baseline from whole days before the window,
+        # so the cost depends on the number of buckets, not on how many items have been seen.
+        now = now or time.time()
+        window_start = int((now - TREND_WINDOW_HOURS * 3600) // 3600 * 3600)
+        base_end = window_start // 86400 * 86400
+        base_start = base_end - TREND_BASELINE_DAYS * 86400
+        with self.lock:
+            first_day = self.conn.execute("SELECT MIN(bucket) FROM trend_counts WHERE resolution = 'day'").fetchone()[0]
+            recent = self.conn.execute(
+                "SELECT dim, value, SUM(count), SUM(uk_count) FROM trend_counts "
+                "WHERE resolution = 'hour' AND bucket >= ? GROUP BY dim, value", (window_start,)
+            ).fetchall()
+            base = self.conn.execute(
+                "SELECT dim, value, SUM(count) FROM trend_counts "
+                "WHERE resolution = 'day' AND bucket >= ? AND bucket < ? GROUP BY dim, value", (base_start, base_end)
+            ).fetchall()
+        # No whole days before the window yet (a fresh store) means no baseline, not a negative one.
+        days = max(0, min(TREND_BASELINE_DAYS, (base_end - first_day) // 86400)) if first_day is not None else 0
+        recent = {(dim, value): (n, uk) for dim, value, n, uk in recent}
+        base = {(dim, value): n for dim, value, n in base}
+        scores = defaultdict(dict)
+        for key in set(recent) | set(base):
+            n, uk = recent.get(key, (0, 0))
+            total = base.get(key, 0)
+            # Expected count for a window of this length, from the per-day baseline.
+            expected = total / days * TREND_WINDOW_HOURS / 24 if days else None
+            scores[key[0]][key[1]] = {
+                "recent": n,
+                "uk_recent": uk,
+                "expected": round(expected, 2) if expected is not None else None,
+                # Poisson-style z-score; +1 keeps thin baselines from producing huge spikes.
+                "spike": round((n - expected) / math.sqrt(expected + 1), 1) if expected is not None else None,
+                # Share of this value's volume over window + baseline that is recent; 1.0 means newly seen.
+                "novelty": round(n / (n + total), 2) if n else 0.0,
+            }
+        return {"window_hours": TREND_WINDOW_HOURS, "baseline_days": days, "scores": scores}
+
+    def stats(self):
+        with self.lock:
+            totals = dict(self.conn.execute("SELECT kind, COUNT(*) FROM items GROUP BY kind").fetchall())
+        updated = sorted({it.get("category") for it in self.new_items["harm"] + self.new_items["forum"] if it.get("category")})
+        return {
+            "new": {kind: len(self.new_items[kind]) for kind in ("harm", "forum", "release")},
+            "total": {kind: totals.get(kind, 0) for kind in ("harm", "forum", "release")},
+            "updated_categories": updated,
+        }
 
+    def close(self):
+        with self.lock:
+            self.conn.close()
 
-def build_forum_items(harm_queries, forum_feeds):
-    items = []
-    seen = set()
-    errors = {}
-    for feed_cfg in forum_feeds:
-        feed = fetch_feed(feed_cfg["url"])
-        if getattr(feed, "bozo", 0):
-            errors[f"forum:{feed_cfg['name']}"] = str(getattr(feed, "bozo_exception", "feed parse error"))
-        for e in getattr(feed, "entries", []):
-            title = strip_source_suffix(getattr(e, "title", "") or "")
-            if not title:
+
+def open_item_store():
+    if not ITEM_STORE_PATH:
+        return None
+    try:
+        return ItemStore(ITEM_STORE_PATH)
+    except sqlite3.Error as e:
+        print(f"Item store unavailable ({e}); falling back to a stateless run")
+        return None
+
+
+# ---------- INCIDENT INDEX ----------
+# AI Incident Database snapshots are read as a stream: the tar.bz2 is decompressed on the fly and
+# incidents.csv parsed row by row. Only incidents past the last ingested id are added, each indexed by
+# title fingerprint, date and the LSH band keys of its MinHash, so linking a signal is a few lookups.
+AIID_ID_KEYS = ("incident_id", "incidentId", "id", "_id")
+AIID_TITLE_KEYS = ("title", "incident_title", "name")
+AIID_DATE_KEYS = ("incident_date", "date", "published_date", "created_at")
+
+
+def first_value(row, keys):
+    for k in keys:
+        v = (row.get(k) or "").strip()
+        if v:
+            return v
+    return None
+
+
+def incident_record(row):
+    incident_id = first_value(row, AIID_ID_KEYS)
+    title = first_value(row, AIID_TITLE_KEYS)
+    if not incident_id or not title:
+        return None
+    date = first_value(row, AIID_DATE_KEYS) or ""
+    return {
+        "incident_id": incident_id,
+        "num": int(incident_id) if incident_id.isdigit() else None,
+        "title": title,
+        "fingerprint": fingerprint_title(title),
+        "date": date[:10],
+        "url": f"https://incidentdatabase.ai/cite/{incident_id}",
+    }
+
+
+def incident_lsh_shape():
+    return lsh_shape(SIGNAL_MINHASH_PERMS, AIID_MATCH_THRESHOLD)
+
+
+def band_keys(sig, shape):
+    bands, rows = shape
+    return [
+        int.from_bytes(hashlib.blake2b(repr((b, sig[b * rows:(b + 1) * rows])).encode(), digest_size=8).digest(), "big") >> 1
+        for b in range(bands)
+    ]
+
+
+def matchable(fp):
+    # Very short fingerprints share shingles with too many unrelated titles to link reliably.
+    return len(fp) >= 3 * SIGNAL_SHINGLE_CHARS
+
+
+class IncidentIndex:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS incidents (
+                incident_id TEXT PRIMARY KEY,
+                num INTEGER,
+                title TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                date TEXT NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS incidents_fingerprint ON incidents (fingerprint);
+            CREATE INDEX IF NOT EXISTS incidents_date ON incidents (date);
+            CREATE TABLE IF NOT EXISTS incident_bands (
+                band INTEGER NOT NULL,
+                incident_id TEXT NOT NULL,
+                PRIMARY KEY (band, incident_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS aiid_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.added = 0
+        self.shape = incident_lsh_shape()
+        self._sigs = {}
+        lsh = json.dumps([SIGNAL_MINHASH_PERMS, SIGNAL_SHINGLE_CHARS, *self.shape])
+        if self.get_meta("lsh") != lsh:
+            self.rebuild_bands(lsh)
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM aiid_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO aiid_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def signature(self, fp):
+        sig = self._sigs.get(fp)
+        if sig is None:
+            sig = self._sigs[fp] = minhash_signature(title_shingles(fp))
+        return sig
+
+    def band_rows(self, recs):
+        return [
+            (band, rec["incident_id"])
+            for rec in recs if matchable(rec["fingerprint"])
+            for band in band_keys(self.signature(rec["fingerprint"]), self.shape)
+        ]
+
+    def rebuild_bands(self, lsh):
+        # Band keys depend on the MinHash and threshold settings; recompute them when those change.
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM incident_bands")
+            rows = self.conn.execute("SELECT incident_id, fingerprint FROM incidents").fetchall()
+            for batch in chunked(({"incident_id": i, "fingerprint": fp} for i, fp in rows), ITEM_STORE_BATCH):
+                self.conn.executemany("INSERT OR IGNORE INTO incident_bands (band, incident_id) VALUES (?, ?)", self.band_rows(batch))
+            self.set_meta("lsh", lsh)
+
+    def ingest(self, rows, snapshot):
+        with self.lock, self.conn:
+            last = int(self.get_meta("last_incident_num") or 0)
+            newest = last
+            for batch in chunked((rec for rec in map(incident_record, rows) if rec), ITEM_STORE_BATCH):
+                fresh = []
+                for rec in batch:
+                    if rec["num"] is not None and rec["num"] <= last:
+                        continue
+                    cur = self.conn.execute(
+                        "INSERT OR IGNORE INTO incidents (incident_id, num, title, fingerprint, date, url) VALUES (?, ?, ?, ?, ?, ?)",
+                        (rec["incident_id"], rec["num"], rec["title"], rec["fingerprint"], rec["date"], rec["url"]),
+                    )
+                    if cur.rowcount:
+                        fresh.append(rec)
+                        newest = max(newest, rec["num"] or 0)
+                self.conn.executemany("INSERT OR IGNORE INTO incident_bands (band, incident_id) VALUES (?, ?)", self.band_rows(fresh))
+                self.added += len(fresh)
+            self.set_meta("last_incident_num", newest)
+            self.set_meta("snapshot", snapshot)
+            self.set_meta("ingested_at", now_iso())
+
+    def match(self, titles, first_seen=None):
+        fps = {fp for fp in map(fingerprint_title, titles) if matchable(fp)}
+        if not fps:
+            return []
+        bands = sorted({band for fp in fps for band in band_keys(self.signature(fp), self.shape)})
+        with self.lock:
+            candidates = self.conn.execute(
+                "SELECT DISTINCT i.incident_id, i.title, i.fingerprint, i.date, i.url FROM incident_bands b "
+                "JOIN incidents i ON i.incident_id = b.incident_id WHERE b.band IN (%s)" % ",".join("?" * len(bands)),
+                bands,
+            ).fetchall()
+        cutoff = ""
+        if AIID_MATCH_MAX_AGE_DAYS > 0 and first_seen:
+            cutoff = datetime.fromtimestamp(first_seen - AIID_MATCH_MAX_AGE_DAYS * 86400, tz=timezone.utc).strftime("%Y-%m-%d")
+        matches = []
+        for incident_id, title, fp, date, url in candidates:
+            if cutoff and date and date < cutoff:
                 continue
-            cat, score = assign_harm_category_from_text(title, harm_queries)
-            if not cat:
-                cat = "Cross-cutting / unassigned"
-            link = clean_url(getattr(e, "link", "") or "")
-            date_str = getattr(e, "published", "") or getattr(e, "updated", "") or ""
-            dt = parse_date(date_str)
-            fp = f"forum::{fingerprint_title(title)}"
-            if fp in seen:
+            sim = max(minhash_similarity(self.signature(fp), self.signature(x)) for x in fps)
+            if sim >= AIID_MATCH_THRESHOLD:
+                matches.append({"incident_id": incident_id, "title": title, "date": date, "url": url, "similarity": round(sim, 3)})
+        matches.sort(key=lambda m: (m["similarity"], m["date"]), reverse=True)
+        return matches[:AIID_MAX_MATCHES]
+
+    def stats(self):
+        with self.lock:
+            total = self.conn.execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+            return {
+                "incidents": total,
+                "new": self.added,
+                "last_incident_id": int(self.get_meta("last_incident_num") or 0) or None,
+                "snapshot": self.get_meta("snapshot"),
+                "ingested_at": self.get_meta("ingested_at"),
+            }
+
+
+_INCIDENT_INDEX = None
+_INCIDENT_INDEX_LOCK = threading.Lock()
+
+
+def incident_index():
+    global _INCIDENT_INDEX
+    with _INCIDENT_INDEX_LOCK:
+        if _INCIDENT_INDEX is None and AIID_DB_PATH and (AIID_SNAPSHOT or os.path.exists(AIID_DB_PATH)):
+            try:
+                _INCIDENT_INDEX = IncidentIndex(AIID_DB_PATH)
+            except sqlite3.Error as e:
+                print(f"Incident index unavailable ({e}); signals won't be linked to incidents")
+                return None
+        return _INCIDENT_INDEX
+
+
+def aiid_snapshot_source():
+    src = AIID_SNAPSHOT
+    if src == "auto":
+        page = fetch_url(AIID_SNAPSHOTS_URL).decode("utf-8", errors="replace")
+        names = sorted(set(AIID_SNAPSHOT_RE.findall(page)))
+        if not names:
+            raise ValueError(f"no backup-*.tar.bz2 listed on {AIID_SNAPSHOTS_URL}")
+        href = re.search(r'href="([^"]*%s)"' % re.escape(names[-1]), page)
+        return names[-1], urljoin(AIID_SNAPSHOTS_URL, href.group(1) if href else names[-1])
+    if os.path.isdir(src):
+        names = sorted(f for f in os.listdir(src) if AIID_SNAPSHOT_RE.fullmatch(f))
+        if not names:
+            raise ValueError(f"no backup-*.tar.bz2 in {src}")
+        src = os.path.join(src, names[-1])
+    return os.path.basename(urlparse(src).path) if src.startswith(("http://", "https://")) else os.path.basename(src), src
+
+
+class ForwardReader(io.RawIOBase):
+    # Members of a stream-mode tarfile can't answer seekable(), which io.TextIOWrapper asks on open.
+    def __init__(self, f):
+        self.f = f
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self.f.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def iter_aiid_incidents(fileobj):
+    # "r|bz2" reads the archive strictly forwards, so neither it nor incidents.csv is held in memory.
+    with tarfile.open(fileobj=fileobj, mode="r|bz2") as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.lower().endswith("incidents.csv"):
                 continue
-            seen.add(fp)
-            items.append({
-                "category": cat,
-                "title": title,
-                "link": link,
-                "source": feed_cfg["name"],
-                "source_type": "forum",
-                "timestamp": dt.timestamp(),
-                "date": dt.isoformat(),
-                "uk_score": uk_score_for_item(title, link, feed_cfg["name"]),
-                "uk_relevance": uk_score_for_item(title, link, feed_cfg["name"]) >= 2,
-                "harm_subtype": derive_subtype(title, cat),
-                "tags": feed_cfg.get("tags", []),
-            })
-    items = sorted(items, key=lambda x: x.get("timestamp", 0), reverse=True)
-    return items[:MAX_FORUM_ITEMS], errors
+            raw = io.BufferedReader(ForwardReader(tar.extractfile(member)))
+            with io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="") as f:
+                yield from csv.DictReader(f)
+            return
 
 
-def build_release_items():
-    items = []
-    seen = set()
-    for source_name, url in [("OpenAI News", OPENAI_NEWS_RSS), ("The Rundown", RUNDOWN_RSS)]:
-        feed = fetch_feed(url)
+def ingest_aiid():
+    index = incident_index()
+    if index is None or not AIID_SNAPSHOT or _REPLAY is not None:
+        return index
+    index.added = 0
+    try:
+        name, src = aiid_snapshot_source()
+        if index.get_meta("snapshot") == name:
+            return index
+        csv.field_size_limit(max(csv.field_size_limit(), 16 * 1024 * 1024))
+        if src.startswith(("http://", "https://")):
+            with http_session().get(src, headers=HEADERS, timeout=120, stream=True) as r:
+                r.raise_for_status()
+                r.raw.decode_content = True
+                index.ingest(iter_aiid_incidents(r.raw), name)
+        else:
+            with open(src, "rb") as f:
+                index.ingest(iter_aiid_incidents(f), name)
+        print(f"Ingested {index.added} new AIID incident(s) from {name}")
+    except (OSError, ValueError, tarfile.TarError, csv.Error, requests.RequestException) as e:
+        print(f"AIID ingestion failed: {e}")
+    return index
+
+
+# ---------- PIPELINE ----------
+# Each source runs as a chain of generators: fetch -> parse -> normalise -> dedupe -> classify -> select.
+# Entries flow one at a time, so only the selected top-K (plus one store batch) is ever held in memory.
+def rank_key(it):
+    return (it.get("uk_score", 0), it.get("relevance_score", 0), it.get("timestamp", 0))
+
+
+def recency_key(it):
+    return it.get("timestamp", 0)
+
+
+class TopK:
+    def __init__(self, k, key):
+        self.k = k
+        self.key = key
+        self.heaps = {}
+        self.seq = 0
+
+    def push(self, group, item):
+        # Returns whatever fell out of the group's top k: the item itself, a displaced one, or None.
+        # Equal keys rank by arrival, matching a stable sort; the heap root is the weakest entry.
+        entry = (self.key(item), -self.seq, item)
+        self.seq += 1
+        heap = self.heaps.setdefault(group, [])
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+            return None
+        if entry[:2] > heap[0][:2]:
+            return heapq.heapreplace(heap, entry)[2]
+        return item
+
+    def groups(self):
+        return {g: [e[2] for e in sorted(heap, key=lambda e: e[:2], reverse=True)] for g, heap in self.heaps.items()}
+
+    def items(self):
+        return [it for vals in self.groups().values() for it in vals]
+
+
+def feed_entries(jobs, errors, kept):
+    # jobs are (meta, label, url); yields (meta, label, entry) while later feeds are still downloading.
+    for meta, label, url in jobs:
+        archive_feed(meta, label, url)
+    for (meta, label, url), feed in zip(jobs, iter_feeds([url for _, _, url in jobs])):
+        parsed = 0
         for e in getattr(feed, "entries", []):
-            title = strip_source_suffix(getattr(e, "title", "") or "")
-            if not title or not looks_like_release(title):
-                continue
-            link = clean_url(getattr(e, "link", "") or "")
-            date_str = getattr(e, "published", "") or getattr(e, "updated", "") or ""
-            dt = parse_date(date_str)
-            fp = fingerprint_title(title)
-            if fp in seen:
-                continue
-            seen.add(fp)
-            items.append({
-                "title": title,
-                "link": link,
-                "source": source_name,
-                "timestamp": dt.timestamp(),
-                "date": dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
-                "source_type": "news",
-            })
-    items = sorted(items, key=lambda x: x.get("timestamp", 0), reverse=True)
-    return items[:MAX_RELEASES]
+            parsed += 1
+            yield meta, label, e
+        if getattr(feed, "bozo", 0):
+            errors[label] = str(getattr(feed, "bozo_exception", "feed parse error"))
+        # Consumers pull one entry at a time, so kept already covers this feed.
+        record_feed_entries(url, label, parsed, kept[label])
+
+
+def normalise_entries(entries):
+    for meta, label, e in entries:
+        title = strip_source_suffix(getattr(e, "title", "") or "")
+        if not title:
+            continue
+        yield meta, label, {
+            "title": title,
+            "link": clean_url(getattr(e, "link", "") or ""),
+            "source": getattr(getattr(e, "source", None), "title", "") or "",
+            "dt": parse_date(getattr(e, "published", "") or getattr(e, "updated", "") or ""),
+        }
 
 
-def cluster_to_signals(items):
-    groups = defaultdict(list)
+def dedupe_entries(entries, key_fn, kept):
+    seen = set()
+    for meta, label, entry in entries:
+        key = key_fn(meta, entry)
+        if key in seen:
+            continue
+        seen.add(key)
+        kept[label] += 1
+        yield meta, label, entry
+
+
+def chunked(iterable, size):
+    batch = []
+    for x in iterable:
+        batch.append(x)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def select_top(items, k, key, group_fn, store=None, kind=None):
+    # Keeps the top k per group; with a store, everything else is upserted in batches as it falls out.
+    top = TopK(k, key)
+    overflow = []
     for it in items:
-        title_fp = fingerprint_title(it.get("title", ""))
-        primary = it.get("category") or "Cross-cutting / unassigned"
-        groups[(primary, title_fp)].append(it)
+        dropped = top.push(group_fn(it), it)
+        if dropped is not None and store is not None:
+            overflow.append(dropped)
+            if len(overflow) >= ITEM_STORE_BATCH:
+                store.upsert(kind, overflow)
+                overflow = []
+    if overflow:
+        store.upsert(kind, overflow)
+    return top
+
+
+def iter_harm_items(harm_queries, categories=None, errors=None):
+    errors = {} if errors is None else errors
+    clf = build_classifier(harm_queries)
+    kept = Counter()
+    # Shards and locales of a category all merge into it; the category::fingerprint key dedupes across them.
+    jobs = harm_feed_jobs(harm_queries, categories)
+    entries = normalise_entries(feed_entries(jobs, errors, kept))
+    entries = dedupe_entries(entries, lambda category, x: f"{category}::{fingerprint_title(x['title'])}", kept)
+    for category, _, x in entries:
+        source = x["source"] or "Google News"
+        result = clf.classify(x["title"], x["link"], source)
+        uk_score = result["uk_score"]
+        yield {
+            "id": stable_id(f"{category}::{fingerprint_title(x['title'])}"),
+            "category": category,
+            "title": x["title"],
+            "link": x["link"],
+            "source": source,
+            "timestamp": x["dt"].timestamp(),
+            "date": x["dt"].strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "relevance_score": result["category_scores"].get(category, 0),
+            "uk_score": uk_score,
+            "uk_relevance": uk_score >= 2,
+            "harm_subtype": clf.subtype(result, category),
+        }
+
+
+def finish_harm_candidates(items):
+    if RESOLVE_GOOGLE_LINKS:
+        # Publisher URLs catch the same article reached through different queries under different titles.
+        items = dedupe_by_link(run_stage("resolve_links", resolve_links, items))
+    return items
+
+
+def collect_harm_items(harm_queries, categories=None):
+    errors = {}
+    items = list(iter_harm_items(harm_queries, categories, errors))
+    return finish_harm_candidates(items), errors
+
+
+def select_harm_items(items):
+    return select_top(items, MAX_PER_HARM, rank_key, lambda it: it["category"]).items()
+
+
+def build_harm_items(harm_queries, store=None):
+    errors = {}
+    # Link resolution gets the wider RESOLVE_PER_CATEGORY candidate pool; the rest only needs the top MAX_PER_HARM.
+    k = max(MAX_PER_HARM, RESOLVE_PER_CATEGORY) if RESOLVE_GOOGLE_LINKS else MAX_PER_HARM
+    items = iter_harm_items(harm_queries, None, errors)
+    top = select_top(items, k, rank_key, lambda it: it["category"], store, "harm")
+    candidates = finish_harm_candidates(top.items())
+    if store is None:
+        return select_harm_items(candidates), errors
+    store.upsert("harm", candidates)
+    since = time.time() - window_seconds(TIME_WINDOW)
+    harms = store.top_harms(list(harm_queries), since, MAX_PER_HARM)
+    if RESOLVE_GOOGLE_LINKS:
+        # Items stored before their link was resolved pick it up from the cache.
+        harms = dedupe_by_link(resolve_links(harms, fetch=False))
+    return harms, errors
+
+
+def categorise_forum_items(items, harm_queries, clf):
+    # Categorise a batch against the category queries in one TF-IDF pass; the keyword count only
+    # decides titles that match no category closely enough.
+    matches = categorise_by_similarity([it["title"] for it, _ in items], harm_queries, FORUM_MIN_SIMILARITY, FORUM_MIN_TERMS)
+    for (it, result), (cat, similarity) in zip(items, matches):
+        if not cat:
+            cat, _ = clf.best_category(result)
+        cat = cat or "Cross-cutting / unassigned"
+        it["category"] = cat
+        it["category_similarity"] = round(similarity, 3)
+        it["harm_subtype"] = clf.subtype(result, cat)
+        yield it
+
+
+def iter_forum_items(harm_queries, forum_feeds, errors=None):
+    errors = {} if errors is None else errors
+    clf = build_classifier(harm_queries)
+    kept = Counter()
+    jobs = [(cfg, f"forum:{cfg['name']}", cfg["url"]) for cfg in forum_feeds if cfg.get("url")]
+    entries = normalise_entries(feed_entries(jobs, errors, kept))
+    entries = dedupe_entries(entries, lambda cfg, x: f"forum::{fingerprint_title(x['title'])}", kept)
+
+    def classified():
+        for cfg, _, x in entries:
+            result = clf.classify(x["title"], x["link"], cfg["name"])
+            yield {
+                "id": stable_id(f"forum::{fingerprint_title(x['title'])}"),
+                "title": x["title"],
+                "link": x["link"],
+                "source": cfg["name"],
+                "source_type": "forum",
+                "timestamp": x["dt"].timestamp(),
+                "date": x["dt"].isoformat(),
+                "uk_score": result["uk_score"],
+                "uk_relevance": result["uk_score"] >= 2,
+                "tags": cfg.get("tags", []),
+            }, result
+
+    # IDF is taken per batch of FORUM_BATCH titles, so one batch covers a normal run.
+    for batch in chunked(classified(), FORUM_BATCH):
+        yield from categorise_forum_items(batch, harm_queries, clf)
+
+
+def collect_forum_items(harm_queries, forum_feeds):
+    errors = {}
+    return list(iter_forum_items(harm_queries, forum_feeds, errors)), errors
+
+
+def build_forum_items(harm_queries, forum_feeds, store=None):
+    errors = {}
+    items = iter_forum_items(harm_queries, forum_feeds, errors)
+    top = select_top(items, MAX_FORUM_ITEMS, recency_key, lambda it: None, store, "forum")
+    if store is None:
+        return top.items(), errors
+    store.upsert("forum", top.items())
+    since = time.time() - window_seconds(TIME_WINDOW)
+    return store.latest("forum", since, MAX_FORUM_ITEMS), errors
+
+
+def iter_release_items(sources=None):
+    clf = build_classifier(DEFAULT_HARM_QUERIES)
+    sources = RELEASE_SOURCES if sources is None else sources
+    kept = Counter()
+    jobs = [(name, f"release:{name}", url) for name, url in sources]
+    entries = normalise_entries(feed_entries(jobs, {}, kept))
+    entries = (x for x in entries if clf.classify(x[2]["title"])["release"])
+    entries = dedupe_entries(entries, lambda name, x: fingerprint_title(x["title"]), kept)
+    for source_name, _, x in entries:
+        yield {
+            "id": stable_id(f"release::{fingerprint_title(x['title'])}"),
+            "title": x["title"],
+            "link": x["link"],
+            "source": source_name,
+            "timestamp": x["dt"].timestamp(),
+            "date": x["dt"].strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "source_type": "news",
+        }
+
+
+def collect_release_items(sources=None):
+    return list(iter_release_items(sources))
+
+
+def build_release_items(store=None):
+    top = select_top(iter_release_items(), MAX_RELEASES, recency_key, lambda it: None, store, "release")
+    if store is None:
+        return top.items()
+    store.upsert("release", top.items())
+    since = time.time() - window_seconds(RELEASE_TIME_WINDOW)
+    return store.latest("release", since, MAX_RELEASES)
+
+
+# ---------- SIGNAL CLUSTERING ----------
+def title_shingles(title_fp, k=None):
+    k = k or SIGNAL_SHINGLE_CHARS
+    text = title_fp or ""
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def minhash_signature(shingles, perms=None):
+    # One-permutation MinHash: hash each shingle once and keep the minimum per bin,
+    # then fill empty bins from the next non-empty one (rotation densification).
+    perms = perms or SIGNAL_MINHASH_PERMS
+    bins = [None] * perms
+    for sh in shingles:
+        h = int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big")
+        b, v = h % perms, h // perms
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    filled = [i for i, v in enumerate(bins) if v is not None]
+    if len(filled) == perms:
+        return tuple(bins)
+    sig = list(bins)
+    for i in range(perms):
+        if sig[i] is not None:
+            continue
+        for dist in range(1, perms):
+            j = (i + dist) % perms
+            if bins[j] is not None:
+                sig[i] = bins[j] + dist * (1 << 58)
+                break
+    return tuple(sig)
+
+
+def minhash_similarity(sig_a, sig_b):
+    return sum(map(operator.eq, sig_a, sig_b)) / len(sig_a)
+
+
+def lsh_shape(perms, threshold):
+    # Pick the band/row split whose S-curve midpoint, (1/b)^(1/r), sits closest to
+    # the threshold from below, so candidates err towards recall and are verified after.
+    best = (perms, 1)
+    best_gap = None
+    for rows in range(1, perms + 1):
+        if perms % rows:
+            continue
+        bands = perms // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        if midpoint > threshold:
+            continue
+        gap = threshold - midpoint
+        if best_gap is None or gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+def cluster_items(items, threshold=None):
+    threshold = SIGNAL_SIM_THRESHOLD if threshold is None else threshold
+    fps = [fingerprint_title(it.get("title", "")) for it in items]
+    sig_by_fp = {fp: minhash_signature(title_shingles(fp)) for fp in set(fps)}
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    # Identical fingerprints always merge; LSH only has to compare distinct ones.
+    first_by_fp = {}
+    for i, fp in enumerate(fps):
+        if fp in first_by_fp:
+            union(first_by_fp[fp], i)
+        else:
+            first_by_fp[fp] = i
+    # So do items that resolved to the same publisher URL.
+    first_by_link = {}
+    for i, it in enumerate(items):
+        link = it.get("link")
+        if not link or is_google_news_link(link):
+            continue
+        if link in first_by_link:
+            union(first_by_link[link], i)
+        else:
+            first_by_link[link] = i
+
+    bands, rows = lsh_shape(SIGNAL_MINHASH_PERMS, threshold)
+    buckets = defaultdict(list)
+    for fp, i in first_by_fp.items():
+        sig = sig_by_fp[fp]
+        for b in range(bands):
+            buckets[(b, sig[b * rows:(b + 1) * rows])].append(i)
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                if minhash_similarity(sig_by_fp[fps[i]], sig_by_fp[fps[j]]) >= threshold:
+                    union(i, j)
+
+    groups = defaultdict(list)
+    for i, it in enumerate(items):
+        groups[find(i)].append(it)
+    return list(groups.values())
+
+
+def signal_confidence(vals):
+    sources = len(set(v.get("source") for v in vals))
+    source_types = len(set(v.get("source_type", "news") for v in vals))
+    score = 0.2 + 0.1 * math.log2(1 + len(vals)) + 0.08 * (sources - 1) + (0.1 if source_types > 1 else 0.0)
+    score = round(min(score, 0.95), 3)
+    if score >= 0.7:
+        return score, "High"
+    if score >= 0.45:
+        return score, "Medium"
+    return score, "Low"
+
+
+def cluster_to_signals(items, terms=None, incidents=None):
+    items = list(items)
+    if terms is None:
+        terms = TermMatrix([it.get("title", "") for it in items])
+    row_of = {id(it): i for i, it in enumerate(items)}
+    clusters = cluster_items(items)
+    themes = terms.group_terms([[row_of[id(v)] for v in vals] for vals in clusters])
     signals = []
-    for (primary, title_fp), vals in groups.items():
+    for vals, kws in zip(clusters, themes):
         vals = sorted(vals, key=lambda x: x.get("timestamp", 0), reverse=True)
-        joined_titles = " ".join(v.get("title", "") for v in vals[:6])
+        # Majority category leads; ties go to the category of the newest item.
+        cats = [v.get("category") or "Cross-cutting / unassigned" for v in vals]
+        cat_counts = Counter(cats)
+        top = max(cat_counts.values())
+        primary = next(c for c in cats if cat_counts[c] == top)
+        # Key the id on the earliest member so it stays put as the cluster grows.
+        earliest = min(vals, key=lambda x: x.get("timestamp", 0))
+        title_fp = fingerprint_title(earliest.get("title", ""))
+        confidence, confidence_label = signal_confidence(vals)
         signal = {
             "signal_id": stable_id(f"{primary}::{title_fp}"),
             "title": vals[0].get("title", ""),
@@ -397,17 +2496,45 @@ def cluster_to_signals(items):
                 }
                 for v in vals[:5]
             ],
-            "confidence": 0.311 if len(vals) > 1 else 0.256,
-            "confidence_label": "Low",
-            "ai_summary": f"Potential {primary} harm: {summarize_list([v.get('title','') for v in vals], max_kws=6)}",
+            "confidence": confidence,
+            "confidence_label": confidence_label,
+            "themes": kws,
+            "ai_summary": f"Potential {primary} harm: {themes_sentence(kws)}",
             "harm_subtype": vals[0].get("harm_subtype", "Other"),
         }
+        if incidents is not None:
+            signal["incidents"] = incidents.match([v.get("title", "") for v in vals[:5]], signal["first_seen"])
         signals.append(signal)
     signals.sort(key=lambda x: x.get("last_seen", 0), reverse=True)
     return signals
 
 
-def build_coverage(harms):
+def trend_summary(trends):
+    scores = trends["scores"]
+    rising = sorted(
+        ((v, s) for v, s in scores.get("source", {}).items() if s["recent"] and s["spike"] is not None),
+        key=lambda vs: (-vs[1]["spike"], vs[0]),
+    )
+    return {
+        "window_hours": trends["window_hours"],
+        "baseline_days": trends["baseline_days"],
+        "overall": scores.get("all", {}).get(""),
+        "by_category": dict(sorted(scores.get("category", {}).items())),
+        "by_subtype": dict(sorted(scores.get("subtype", {}).items())),
+        "rising_sources": dict(rising[:TREND_TOP_SOURCES]),
+    }
+
+
+def attach_signal_trends(signals, trends):
+    scores = trends["scores"]
+    for sig in signals:
+        score = scores.get("subtype", {}).get(sig.get("harm_subtype")) or scores.get("category", {}).get(sig.get("primary_category"))
+        sig["spike"] = score["spike"] if score else None
+        sig["novelty"] = score["novelty"] if score else None
+    return signals
+
+
+def build_coverage(harms, trends=None):
     by_harm = {}
     for it in harms:
         c = it.get("category", "Cross-cutting / unassigned")
@@ -415,32 +2542,307 @@ def build_coverage(harms):
         by_harm[c]["count"] += 1
         if it.get("uk_relevance"):
             by_harm[c]["uk_count"] += 1
-    return {"by_harm": by_harm}
-
-
-def build_summaries(harms):
+    if trends is None:
+        return {"by_harm": by_harm}
+    for c, row in by_harm.items():
+        score = trends["scores"].get("category", {}).get(c) or {}
+        row.update(spike=score.get("spike"), novelty=score.get("novelty"))
+    return {"by_harm": by_harm, "trends": trend_summary(trends)}
+
+
+def build_summaries(harms, terms=None):
+    # terms may cover more titles than harms, as long as harms come first.
+    if terms is None:
+        terms = TermMatrix([it.get("title", "") for it in harms])
     grouped = defaultdict(list)
-    for it in harms:
-        grouped[it.get("category", "Cross-cutting / unassigned")].append(it)
+    for i, it in enumerate(harms):
+        grouped[it.get("category", "Cross-cutting / unassigned")].append(i)
+    themes = dict(zip(grouped, terms.group_terms(list(grouped.values()))))
     harm_summaries = {}
-    for cat, vals in grouped.items():
+    for cat, rows in grouped.items():
+        vals = [harms[i] for i in rows]
         subtype_counts = Counter(v.get("harm_subtype", "Other") for v in vals)
         top_bits = ", ".join([f"{k} ({v})" for k, v in subtype_counts.most_common(3)])
         uk_n = sum(1 for v in vals if v.get("uk_relevance"))
-        harm_summaries[cat] = f"{len(vals)} harms item(s), {uk_n} UK-relevant. Main subtypes: {top_bits}."
-    return {"harms_by_category": harm_summaries}
+        harm_summaries[cat] = f"{len(vals)} harms item(s), {uk_n} UK-relevant. Main subtypes: {top_bits}. {themes_sentence(themes[cat])}"
+    return {"harms_by_category": harm_summaries, "themes_by_category": themes}
+
+
+# ---------- OUTPUT ----------
+SECTION_RECENCY_KEYS = {"signals": "last_seen"}
+# The manifest and deltas carry only what the dashboard reads; run diagnostics stay in the full output.
+PUBLIC_META_KEYS = ("limits", "dedupe_mode", "taxonomy_version", "errors", "change_feed")
+
+
+def public_meta(meta):
+    return {k: meta[k] for k in PUBLIC_META_KEYS if k in meta}
+
+
+def compact_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_shard(name, obj):
+    body = compact_json(obj)
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    filename = f"{name}.{digest}.json"
+    path = os.path.join(SHARD_DIR, filename)
+    # Content-addressed: an unchanged shard keeps its name and is never rewritten.
+    if not os.path.exists(path):
+        write_file_atomic(path + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_file_atomic(path + ".br", brotli.compress(body, quality=11))
+        write_file_atomic(path, body)
+    return {"file": filename, "bytes": len(body)}
 
 
-def run():
-    harm_queries = load_json_if_exists(os.path.join(BASE_DIR, "harm_queries.json"), DEFAULT_HARM_QUERIES)
-    forum_feeds = load_json_if_exists(os.path.join(BASE_DIR, "forum_feeds.json"), DEFAULT_FORUM_FEEDS)
+def write_single_payload(payload, search_index=None):
+    out_path = os.path.join(OUTPUT_DIR, "news_data.json")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {out_path}")
+    if search_index is not None:
+        index_path = os.path.join(OUTPUT_DIR, "news_index.json")
+        write_file_atomic(index_path, compact_json(search_index))
+        print(f"Wrote {index_path}")
+
+
+def write_sharded_payload(payload, search_index=None):
+    manifest = {
+        "format": "sharded_v1",
+        "last_updated": payload["last_updated"],
+        "disclaimer": payload["disclaimer"],
+        "meta": public_meta(payload["meta"]),
+        "page_size": SHARD_PAGE_SIZE,
+        "sections": {},
+    }
+    for section, items in payload["sections"].items():
+        key = SECTION_RECENCY_KEYS.get(section, "timestamp")
+        items = sorted(items, key=lambda x: x.get(key, 0), reverse=True)
+        pages = []
+        for page, start in enumerate(range(0, len(items), SHARD_PAGE_SIZE)):
+            chunk = items[start:start + SHARD_PAGE_SIZE]
+            shard = write_shard(f"{section}.p{page}", chunk)
+            shard.update({"count": len(chunk), "newest": chunk[0].get(key, 0), "oldest": chunk[-1].get(key, 0)})
+            pages.append(shard)
+        manifest["sections"][section] = {"count": len(items), "pages": pages}
+    for name in ("coverage", "summaries"):
+        manifest[name] = write_shard(name, payload[name])
+    if search_index is not None:
+        manifest["search_index"] = write_shard("search_index", search_index)
+
+    manifest_path = os.path.join(SHARD_DIR, "manifest.json")
+    previous = load_json_if_exists(manifest_path, {}) or {}
+    write_file_atomic(manifest_path, compact_json(manifest))
+    # Keep the previous manifest's shards so clients mid-load don't hit 404s.
+    keep = {"manifest.json"}
+    for m in (manifest, previous):
+        for sec in (m.get("sections") or {}).values():
+            keep.update(pg["file"] for pg in sec.get("pages", []))
+        keep.update(m[name]["file"] for name in ("coverage", "summaries", "search_index") if m.get(name))
+    for filename in os.listdir(SHARD_DIR):
+        base = re.sub(r"\.(gz|br)$", "", filename)
+        if base not in keep and base.endswith(".json"):
+            os.remove(os.path.join(SHARD_DIR, filename))
+    print(f"Wrote {manifest_path}")
+
+
+# ---------- CHANGE FEED ----------
+# changes/index.json names the current version, the latest full snapshot and the deltas kept in the
+# ring. A client at version v applies each delta with "from" >= v in order; one that has fallen behind
+# the ring loads the snapshot first. DELTA_STATE_FILE, kept with the rest of the scraper state rather
+# than the published files, holds the item hashes the next run is diffed against.
+SECTION_KEYS = {"signals": "signal_id"}
+# Trend scores slide with the window every run; they don't make an entry "updated" on their own.
+# Clients after fresh values read coverage.trends, which is resent whenever it changes.
+VOLATILE_FIELDS = {"signals": ("spike", "novelty")}
+CHANGE_FILE_RE = re.compile(r"^(delta|snapshot)\.\d+\.json$")
+
+
+def entry_key(section, it):
+    return str(it.get(SECTION_KEYS.get(section, "id")) or stable_id(it.get("link") or it.get("title", "")))
+
+
+def content_hash(obj):
+    return hashlib.sha256(compact_json(obj)).hexdigest()[:16]
+
+
+def payload_entries(payload):
+    return {section: {entry_key(section, it): it for it in items} for section, items in payload["sections"].items()}
+
+
+def entry_hash(section, it):
+    volatile = VOLATILE_FIELDS.get(section, ())
+    return content_hash({k: v for k, v in it.items() if k not in volatile} if volatile else it)
+
+
+def payload_hashes(entries, payload):
+    hashes = {"sections": {s: {k: entry_hash(s, it) for k, it in items.items()} for s, items in entries.items()}}
+    for name in ("coverage", "summaries"):
+        hashes[name] = content_hash(payload[name])
+    return hashes
+
+
+def diff_payload(entries, payload, hashes, previous):
+    delta = {"sections": {}}
+    before_sections = previous.get("sections", {})
+    for section in sorted(set(entries) | set(before_sections)):
+        current, before = entries.get(section, {}), before_sections.get(section, {})
+        now = hashes["sections"].get(section, {})
+        added = [it for k, it in current.items() if k not in before]
+        updated = [it for k, it in current.items() if k in before and before[k] != now[k]]
+        expired = sorted(k for k in before if k not in current)
+        if added or updated or expired:
+            delta["sections"][section] = {"added": added, "updated": updated, "expired": expired}
+    for name in ("coverage", "summaries"):
+        if hashes[name] != previous.get(name):
+            delta[name] = payload[name]
+    return delta if len(delta) > 1 or delta["sections"] else None
+
+
+def write_change_file(name, obj):
+    body = compact_json(obj)
+    write_file_atomic(os.path.join(DELTA_DIR, name), body)
+    return {"file": name, "bytes": len(body)}
+
+
+def write_change_feed(payload):
+    index_path = os.path.join(DELTA_DIR, "index.json")
+    index = load_json_if_exists(index_path, {}) or {}
+    state = load_json_if_exists(DELTA_STATE_FILE, {}) or {}
+    version = int(index.get("version") or 0)
+    feed_info = {"version": version, "index": os.path.relpath(index_path, OUTPUT_DIR)}
+    # A state file that doesn't match the index can't be diffed against; start again from a snapshot.
+    previous = state.get("hashes") if state.get("version") == version and index.get("snapshot") else None
+
+    entries = payload_entries(payload)
+    hashes = payload_hashes(entries, payload)
+    delta = diff_payload(entries, payload, hashes, previous) if previous else None
+    if previous and delta is None:
+        return feed_info
+
+    version += 1
+    header = {"version": version, "last_updated": payload["last_updated"]}
+    deltas = list(index.get("deltas") or []) if previous else []
+    if delta is not None:
+        counts = {k: sum(len(sec[k]) for sec in delta["sections"].values()) for k in ("added", "updated", "expired")}
+        entry = write_change_file(f"delta.{version}.json", {
+            "format": "delta_v1", **header, "from": version - 1,
+            "meta": public_meta(payload["meta"]), **delta,
+        })
+        deltas.append({"version": version, "from": version - 1, **entry, **counts})
+    deltas = deltas[-DELTA_RING:] if DELTA_RING > 0 else []
+
+    snapshot = index.get("snapshot") if previous else None
+    if snapshot is None or version - snapshot["version"] >= min(DELTA_SNAPSHOT_EVERY, DELTA_RING):
+        snapshot = {"version": version, **write_change_file(f"snapshot.{version}.json", {
+            "format": "snapshot_v1", **header, **payload,
+        })}
+
+    new_index = {
+        "format": "changes_v1",
+        **header,
+        "snapshot": snapshot,
+        "deltas": deltas,
+    }
+    # Keep the previous snapshot so clients mid-load don't hit 404s.
+    keep = {d["file"] for d in deltas} | {snapshot["file"]}
+    if index.get("snapshot"):
+        keep.add(index["snapshot"]["file"])
+    write_file_atomic(DELTA_STATE_FILE, compact_json({"version": version, "hashes": hashes}))
+    write_file_atomic(index_path, compact_json(new_index))
+    for filename in os.listdir(DELTA_DIR):
+        if CHANGE_FILE_RE.match(filename) and filename not in keep:
+            os.remove(os.path.join(DELTA_DIR, filename))
+    print(f"Wrote {index_path} (version {version}, {len(deltas)} deltas)")
+    return {**feed_info, "version": version}
+
+
+# ---------- SEARCH INDEX ----------
+# Docs are numbered across sections in payload order ("sections" gives each one's [start, count]) and
+# "ids" holds each doc's item id. Postings are sorted doc numbers stored as gaps from the previous one.
+SEARCH_FIELDS = ("title", "source", "category", "primary_category", "harm_subtype", "tags", "themes", "ai_summary")
+
+
+def search_tokens(it):
+    parts = []
+    for field in SEARCH_FIELDS:
+        value = it.get(field)
+        parts.extend(value if isinstance(value, list) else [value])
+    parts.extend(link.get("source") for link in it.get("links") or [])
+    return {t for t in norm_text(" ".join(p for p in parts if isinstance(p, str))).split() if len(t) > 1}
+
+
+def item_facets(section, it):
+    links = it.get("links") or []
+    if section == "dev_releases":
+        category = "Model Releases"
+    else:
+        category = it.get("primary_category") or it.get("category") or "Cross-cutting / unassigned"
+    uk_score = it.get("uk_score")
+    if uk_score is None:
+        uk_score = 2 if it.get("uk_relevance") else 0
+    ts = it.get("last_seen") or it.get("timestamp")
+    return {
+        "category": [category],
+        "subtype": [it.get("harm_subtype")],
+        "source": [it.get("source")] + [link.get("source") for link in links],
+        "source_type": [link.get("source_type") for link in links] if links else [it.get("source_type") or "news"],
+        "uk": ["1"] if it.get("uk_relevance") or uk_score >= 2 else [],
+        "uk_score": [str(uk_score)],
+        "date": [datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")] if ts else [],
+    }
 
-    harms, harm_errors = build_harm_items(harm_queries)
-    forums, forum_errors = build_forum_items(harm_queries, forum_feeds)
-    releases = build_release_items()
-    signals = cluster_to_signals(harms + forums)
 
-    payload = {
+def gap_encode(postings):
+    return [doc - prev for prev, doc in zip([0] + postings, postings)]
+
+
+def build_search_index(payload):
+    ids, sections = [], {}
+    tokens = defaultdict(list)
+    facets = defaultdict(lambda: defaultdict(list))
+    for section, items in payload["sections"].items():
+        sections[section] = [len(ids), len(items)]
+        for it in items:
+            doc = len(ids)
+            ids.append(entry_key(section, it))
+            for token in search_tokens(it):
+                tokens[token].append(doc)
+            for facet, values in item_facets(section, it).items():
+                for value in {str(v) for v in values if v}:
+                    facets[facet][value].append(doc)
+    return {
+        "format": "search_v1",
+        "last_updated": payload["last_updated"],
+        "sections": sections,
+        "ids": ids,
+        "tokens": {t: gap_encode(p) for t, p in sorted(tokens.items())},
+        "facets": {f: {v: gap_encode(p) for v, p in sorted(vals.items())} for f, vals in sorted(facets.items())},
+    }
+
+
+def write_outputs(payload):
+    if DELTA_DIR:
+        payload["meta"]["change_feed"] = write_change_feed(payload)
+    search_index = run_stage("build_search_index", build_search_index, payload) if SEARCH_INDEX else None
+    if OUTPUT_MODE in ("single", "both"):
+        write_single_payload(payload, search_index)
+    if OUTPUT_MODE in ("sharded", "both"):
+        write_sharded_payload(payload, search_index)
+
+
+def build_payload(harms, forums, releases, errors, store_stats, run_started, extra_meta=None, trends=None, incidents=None):
+    # One TF-IDF matrix serves signal and category themes; harms are its first rows.
+    terms = run_stage("build_term_matrix", TermMatrix, (it.get("title", "") for it in chain(harms, forums)))
+    signals = run_stage("cluster_to_signals", cluster_to_signals, chain(harms, forums), terms, incidents)
+    if trends is not None:
+        attach_signal_trends(signals, trends)
+    coverage = run_stage("build_coverage", build_coverage, harms, trends)
+    summaries = run_stage("build_summaries", build_summaries, harms, terms)
+
+    return {
         "last_updated": now_iso(),
         "disclaimer": "Automated horizon-scanning prototype. Items indicate emerging discussion, not verified risk, intent, or prevalence.",
         "meta": {
@@ -455,7 +2857,14 @@ def run():
             "dedupe_mode": DEDUP_MODE,
             "taxonomy_version": "ho_owned_risk_areas_v3_no_ra10",
             "taxonomy_note": "Visible top-level categories use only current HO-owned risk areas from the current HO-owned sheet (RA09, RA11, RA13, RA14) plus Cross-cutting / unassigned.",
-            "errors": {**harm_errors, **forum_errors},
+            "errors": errors,
+            "http_cache": http_cache_stats(),
+            "link_cache": link_cache().stats() if RESOLVE_GOOGLE_LINKS else None,
+            "feed_health": feed_health().summary(),
+            "item_store": store_stats,
+            "aiid": {**incidents.stats(), "linked_signals": sum(1 for s in signals if s.get("incidents"))} if incidents else None,
+            "stats": run_stats(run_started),
+            **(extra_meta or {}),
         },
         "sections": {
             "harms": harms,
@@ -463,55 +2872,303 @@ def run():
             "forums": forums,
             "dev_releases": releases,
         },
-        "coverage": build_coverage(harms),
-        "summaries": build_summaries(harms),
+        "coverage": coverage,
+        "summaries": summaries,
     }
 
-    out_path = os.path.join(BASE_DIR, "news_data.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    print(f"Wrote {out_path}")
 
+def load_sources(harm_queries=None, forum_feeds=None):
+    if harm_queries is None:
+        harm_queries = load_json_if_exists(os.path.join(BASE_DIR, "harm_queries.json"), DEFAULT_HARM_QUERIES)
+    if forum_feeds is None:
+        forum_feeds = load_json_if_exists(os.path.join(BASE_DIR, "forum_feeds.json"), DEFAULT_FORUM_FEEDS)
+    return harm_queries, forum_feeds
+
+
+def run(harm_queries=None, forum_feeds=None):
+    harm_queries, forum_feeds = load_sources(harm_queries, forum_feeds)
+
+    run_started = time.perf_counter()
+    reset_run_stats()
+    if STATS_TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    store = open_item_store()
+    start_archive_run()
+
+    # Builders run side by side so their fetches share the pool and per-host limits.
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="stage") as stages:
+        harm_job = stages.submit(run_stage, "build_harm_items", build_harm_items, harm_queries, store)
+        forum_job = stages.submit(run_stage, "build_forum_items", build_forum_items, harm_queries, forum_feeds, store)
+        release_job = stages.submit(run_stage, "build_release_items", build_release_items, store)
+        aiid_job = stages.submit(run_stage, "ingest_aiid", ingest_aiid)
+        harms, harm_errors = harm_job.result()
+        forums, forum_errors = forum_job.result()
+        releases = release_job.result()
+        incidents = aiid_job.result()
+    archive_run_id = finish_archive_run()
+    extra_meta = {"archive_run": archive_run_id}
+    if _REPLAY is not None:
+        extra_meta = {"reprocessed_from": {"run_id": _REPLAY["run_id"], "fetched_at": _REPLAY["started_at"]}}
+    else:
+        feed_health().save(feed_labels())
+        run_stage("prune_http_cache", prune_http_cache)
+    store_stats = trends = None
+    if store is not None:
+        pruned = store.prune()
+        store_stats = {**store.stats(), "pruned": pruned}
+        trends = run_stage("trend_scores", store.trend_scores)
+        store.close()
+    payload = build_payload(
+        harms, forums, releases, {**harm_errors, **forum_errors}, store_stats, run_started, extra_meta, trends, incidents,
+    )
+    run_stage("write_outputs", write_outputs, payload)
+    # The metrics file also gets the write_outputs timing, which meta.stats cannot include.
+    write_metrics(run_stats(run_started))
+    if STATS_TRACE_MEMORY:
+        tracemalloc.stop()
+    return payload
+
+
+# ---------- DAEMON ----------
+class HostBudget:
+    def __init__(self, per_hour):
+        self.capacity = max(1.0, per_hour)
+        self.rate = self.capacity / 3600.0
+        self.tokens = self.capacity
+        self.updated = time.time()
+
+    def take(self, now, cost=1):
+        # Returns 0 when a poll may go ahead, otherwise seconds until one may.
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class FeedSchedule:
+    def __init__(self, path, feeds):
+        self.path = path
+        self.feeds = feeds
+        saved = load_json_if_exists(path, {}) or {}
+        saved = saved.get("feeds", {}) if isinstance(saved, dict) else {}
+        self.state = {}
+        for key, feed in feeds.items():
+            st = saved.get(key) if isinstance(saved.get(key), dict) else {}
+            self.state[key] = {
+                "url": feed["url"],
+                "interval": min(DAEMON_MAX_INTERVAL, max(DAEMON_MIN_INTERVAL, float(st.get("interval", DAEMON_START_INTERVAL)))),
+                "next_due": float(st.get("next_due", 0)) if st.get("url") == feed["url"] else 0.0,
+                "last_polled": st.get("last_polled"),
+                "rate": st.get("rate"),
+                "polls": int(st.get("polls", 0)),
+                "new": int(st.get("new", 0)),
+            }
+        self.budgets = {}
+
+    def budget(self, host):
+        if host not in self.budgets:
+            self.budgets[host] = HostBudget(HOST_POLLS_PER_HOUR.get(host, DEFAULT_HOST_POLLS_PER_HOUR))
+        return self.budgets[host]
+
+    def take_due(self, now):
+        due = []
+        for key in sorted(self.state, key=lambda k: self.state[k]["next_due"]):
+            st = self.state[key]
+            if st["next_due"] > now:
+                break
+            wait = self.budget(host_key(st["url"])).take(now, len(self.feeds[key].get("urls", [st["url"]])))
+            if wait:
+                st["next_due"] = now + wait
+            else:
+                due.append(key)
+        return due
+
+    def record(self, key, new, now):
+        st = self.state[key]
+        # The first poll only fills the store with the feed's backlog, so it says nothing about its rate.
+        if st["last_polled"]:
+            sample = new / max(now - st["last_polled"], 1.0)
+            st["rate"] = sample if st["rate"] is None else DAEMON_RATE_ALPHA * sample + (1 - DAEMON_RATE_ALPHA) * st["rate"]
+            interval = DAEMON_TARGET_NEW / st["rate"] if st["rate"] > 0 else st["interval"] * 2
+            if not new:
+                # A quiet poll never brings the next one forward.
+                interval = max(interval, st["interval"] * 1.25)
+            st["interval"] = min(DAEMON_MAX_INTERVAL, max(DAEMON_MIN_INTERVAL, interval))
+        st["next_due"] = now + st["interval"] * (1 + random.uniform(-DAEMON_JITTER, DAEMON_JITTER))
+        st["last_polled"] = now
+        st["polls"] += 1
+        st["new"] += new
+
+    def next_wakeup(self):
+        return min((st["next_due"] for st in self.state.values()), default=time.time() + DAEMON_MAX_INTERVAL)
+
+    def save(self):
+        write_file_atomic(self.path, json.dumps({"updated": now_iso(), "feeds": self.state}, indent=2).encode("utf-8"))
+
+    def summary(self):
+        return [
+            {
+                "feed": key,
+                "interval_s": round(st["interval"]),
+                "new_per_hour": round((st["rate"] or 0) * 3600, 2),
+                "polls": st["polls"],
+                "new": st["new"],
+            }
+            for key, st in sorted(self.state.items(), key=lambda kv: kv[1]["interval"])
+        ]
+
+
+def daemon_feeds(harm_queries, forum_feeds):
+    feeds = {}
+    by_category = defaultdict(list)
+    for category, _, url in harm_feed_jobs(harm_queries):
+        by_category[category].append(url)
+    # A category is scheduled as one feed; its shards and locales are fetched together.
+    for category, urls in by_category.items():
+        feeds[f"google:{category}"] = {"kind": "harm", "url": urls[0], "urls": urls, "category": category}
+    for cfg in forum_feeds:
+        if cfg.get("url"):
+            feeds[f"forum:{cfg['name']}"] = {"kind": "forum", "url": cfg["url"], "cfg": cfg}
+    for name, url in RELEASE_SOURCES:
+        feeds[f"release:{name}"] = {"kind": "release", "url": url, "source": (name, url)}
+    return feeds
+
+
+def poll_feeds(keys, feeds, harm_queries, store):
+    picked = [feeds[k] for k in keys]
+    categories = [f["category"] for f in picked if f["kind"] == "harm"]
+    forum_cfgs = [f["cfg"] for f in picked if f["kind"] == "forum"]
+    release_sources = [f["source"] for f in picked if f["kind"] == "release"]
+    errors = {}
+    new_by_feed = Counter()
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="stage") as stages:
+        jobs = []
+        if categories:
+            jobs.append(("harm", stages.submit(collect_harm_items, harm_queries, categories)))
+        if forum_cfgs:
+            jobs.append(("forum", stages.submit(collect_forum_items, harm_queries, forum_cfgs)))
+        if release_sources:
+            jobs.append(("release", stages.submit(collect_release_items, release_sources)))
+        for kind, job in jobs:
+            items, errs = job.result() if kind != "release" else (job.result(), {})
+            errors.update(errs)
+            for it in store.upsert(kind, items):
+                prefix = {"harm": "google", "forum": "forum", "release": "release"}[kind]
+                new_by_feed[f"{prefix}:{it['category'] if kind == 'harm' else it['source']}"] += 1
+    return new_by_feed, errors
+
+
+def store_sections(store, harm_queries):
+    now = time.time()
+    since = now - window_seconds(TIME_WINDOW)
+    harms = store.top_harms(list(harm_queries), since, MAX_PER_HARM)
+    if RESOLVE_GOOGLE_LINKS:
+        harms = dedupe_by_link(resolve_links(harms, fetch=False))
+    forums = store.latest("forum", since, MAX_FORUM_ITEMS)
+    releases = store.latest("release", now - window_seconds(RELEASE_TIME_WINDOW), MAX_RELEASES)
+    return harms, forums, releases
+
+
+def publish_from_store(store, harm_queries, errors, schedule, cycle_started):
+    archive_run_id = finish_archive_run()
+    start_archive_run()
+    run_stage("prune_http_cache", prune_http_cache)
+    pruned = store.prune()
+    store_stats = {**store.stats(), "pruned": pruned}
+    store.new_items.clear()
+    harms, forums, releases = store_sections(store, harm_queries)
+    payload = build_payload(
+        harms, forums, releases, dict(errors), store_stats, cycle_started,
+        extra_meta={"schedule": schedule.summary(), "archive_run": archive_run_id},
+        trends=run_stage("trend_scores", store.trend_scores),
+        incidents=run_stage("ingest_aiid", ingest_aiid),
+    )
+    run_stage("write_outputs", write_outputs, payload)
+    write_metrics(run_stats(cycle_started))
 
-if __name__ == "__main__":
-    run()
-``
-import os
-import re
-import time
-import hashlib
-from collections import Counter, defaultdict
-from datetime import datetime, timezone
-from email.utils import parsedate_to_datetime
-from urllib.parse import quote_plus, urlparse, parse_qsl, urlencode, urlunparse
-
-import feedparser
-import requests
 
-BASE_DIR = os.path.dirname(__file__)
+def run_daemon(harm_queries=None, forum_feeds=None):
+    harm_queries, forum_feeds = load_sources(harm_queries, forum_feeds)
+    store = open_item_store()
+    if store is None:
+        raise SystemExit("Daemon mode needs the item store; set ITEM_STORE_PATH to a writable file.")
+    feeds = daemon_feeds(harm_queries, forum_feeds)
+    schedule = FeedSchedule(SCHEDULE_FILE, feeds)
+    errors = {}
+    first_new = last_new = None
+    published = False
+    reset_run_stats()
+    cycle_started = time.perf_counter()
+    print(f"Daemon polling {len(feeds)} feeds; schedule in {SCHEDULE_FILE}")
+    start_archive_run()
+    try:
+        while True:
+            now = time.time()
+            due = schedule.take_due(now)
+            if due:
+                new_by_feed, errs = run_stage("poll_feeds", poll_feeds, due, feeds, harm_queries, store)
+                polled_at = time.time()
+                for key in due:
+                    for label in [k for k in errors if k == key or k.startswith(key + " [")]:
+                        del errors[label]
+                    schedule.record(key, new_by_feed[key], polled_at)
+                errors.update(errs)
+                schedule.save()
+                feed_health().save(feed_labels())
+                if sum(new_by_feed.values()):
+                    first_new = first_new or polled_at
+                    last_new = polled_at
+                    print(f"{sum(new_by_feed.values())} new item(s) from {len(new_by_feed)} of {len(due)} polled feed(s)")
+
+            # Debounce: wait for a quiet spell before rewriting, but never hold new items past DAEMON_DEBOUNCE_MAX.
+            now = time.time()
+            publish_at = None
+            if first_new is not None:
+                publish_at = min(last_new + DAEMON_DEBOUNCE, first_new + DAEMON_DEBOUNCE_MAX)
+            elif not published:
+                publish_at = now
+            if publish_at is not None and now >= publish_at:
+                publish_from_store(store, harm_queries, errors, schedule, cycle_started)
+                first_new = last_new = None
+                published = True
+                reset_run_stats()
+                cycle_started = time.perf_counter()
+                publish_at = None
+
+            wake = schedule.next_wakeup() if publish_at is None else min(schedule.next_wakeup(), publish_at)
+            time.sleep(min(max(wake - time.time(), 1.0), DAEMON_MAX_INTERVAL))
+    except KeyboardInterrupt:
+        print("Stopping daemon")
+        if first_new is not None:
+            publish_from_store(store, harm_queries, errors, schedule, cycle_started)
+    finally:
+        finish_archive_run()
+        schedule.save()
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the AI harms horizon-scanning feed.")
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="keep running, polling each feed on its own adaptive schedule and rewriting outputs as new items arrive",
+    )
+    parser.add_argument(
+        "--reprocess", metavar="RUNS",
+        help="rebuild outputs from archived responses without network access: a run id, 'latest', "
+             "a date (YYYY-MM-DD) or a date range (YYYY-MM-DD..YYYY-MM-DD); written under OUTPUT_DIR/reprocessed/",
+    )
+    args = parser.parse_args()
+    if args.reprocess:
+        reprocess(args.reprocess)
+    elif args.daemon:
+        run_daemon()
+    else:
+        run()
 
-# ---------- DEFAULTS ----------
-DEFAULT_HARM_QUERIES = {
-    "RA09 – AI use in financial crime, fraud and exploitation": (
-        "AI scam OR AI fraud OR AI phishing OR voice cloning scam OR AI impersonation "
-        "OR AI money laundering OR mule recruitment"
-    ),
-    "RA11 – AI Use for Sexual Crime and Abuse": (
-        "deepfake abuse OR image-based abuse OR NCII OR non-consensual intimate imagery OR AI harassment "
-        "OR AI stalking OR AI sextortion OR AI grooming OR AI-generated child abuse material OR CSAM AI"
-    ),
-    "RA13 – AI use in terrorism": (
-        "AI extremism OR AI radicalisation OR synthetic propaganda OR extremist chatbot "
-        "OR terrorist recruitment AI OR terrorist attack planning AI"
-    ),
-    "RA14 – AI increases illegal item creation and acquisition": (
-        "AI weapons OR AI drugs OR AI crime instructions OR AI malware OR LLM exploit OR prompt injection "
-        "OR jailbreak OR ransomware AI OR dark web AI OR counterfeit goods AI"
-    ),
-    "Cross-cutting / unassigned": (
-        "AI violence OR AI-enabled crime OR false evidence AI OR liar's dividend OR fake identity documents AI "
-        "OR border exploitation AI OR immigration abuse chatbot"
-    ),
-}
 
-DEFAULT_FORUM_FEEDS = [
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,9 @@ import {
   X,
 } from "lucide-react";
 
+// Opt-in at build time for deployments that publish news_data/ shards (OUTPUT_MODE=sharded|both).
+const SHARDED_OUTPUT = import.meta.env.VITE_NEWS_SHARDED === "1";
+
 function fmtDateShort(d) {
   if (!d) return "";
   const t = Date.parse(d);
@@ -137,8 +140,27 @@ export default function App() {
     try { localStorage.setItem("aihm_ui_prefs_v7", JSON.stringify({ view, showN, showAiSummaries })); } catch {}
   }, [view, showN, showAiSummaries]);
 
-  async function load() {
-    setLoading(true);
+  async function loadSharded() {
+    // Sharded output: only the manifest is cache-busted; shards are content-hashed.
+    const base = `${import.meta.env.BASE_URL}news_data/`;
+    const { data: manifest } = await axios.get(`${base}manifest.json?ts=${Date.now()}`);
+    const shard = async (file) => (await axios.get(`${base}${file}`)).data;
+    const names = Object.keys(manifest.sections || {});
+    const [coverage, summaries, ...firstPages] = await Promise.all([
+      shard(manifest.coverage.file),
+      shard(manifest.summaries.file),
+      ...names.map((n) => (manifest.sections[n].pages[0] ? shard(manifest.sections[n].pages[0].file) : [])),
+    ]);
+    setPayload({ ...manifest, coverage, summaries, sections: Object.fromEntries(names.map((n, i) => [n, firstPages[i]])) });
+    setLoading(false);
+    // The rest load after first paint; if one fails, keep showing the first pages rather than
+    // falling back to news_data.json, which a sharded-only deployment doesn't publish.
+    Promise.all(names.map((n) => Promise.all(manifest.sections[n].pages.slice(1).map((p) => shard(p.file)))))
+      .then((rest) => setPayload((prev) => prev && { ...prev, sections: Object.fromEntries(names.map((n, i) => [n, firstPages[i].concat(...rest[i])])) }))
+      .catch((e) => console.error("Failed to load remaining news_data pages", e));
+  }
+
+  async function loadSingle() {
     try {
       const res = await axios.get(`${import.meta.env.BASE_URL}news_data.json?ts=${Date.now()}`);
       setPayload(res.data);
@@ -146,6 +168,19 @@ export default function App() {
       console.error(e);
       setPayload(null);
     }
+  }
+
+  async function load() {
+    setLoading(true);
+    if (!SHARDED_OUTPUT) {
+      await loadSingle();
+    } else {
+      try {
+        await loadSharded();
+      } catch {
+        await loadSingle();
+      }
+    }
     setLoading(false);
   }
   useEffect(() => { load(); }, []);